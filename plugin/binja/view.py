@@ -1,5 +1,7 @@
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from time import perf_counter
 
 from binaryninja import (
     Architecture,
@@ -13,21 +15,24 @@ from binaryninja import (
     log_error_for_exception,
     show_message_box,
 )
-from binaryninja.log import log_error, log_warn
+from binaryninja.log import log_error, log_info, log_warn
 
 IBIS_PATH = Path(__file__).resolve().parent.parent.parent / "src"
 
 if IBIS_PATH not in sys.path:
     sys.path.insert(0, str(IBIS_PATH))
 
-from ibis.analyzer import analyze  # noqa: E402
-from ibis.driver import Driver  # noqa: E402
+from ibis.analyzer import analyze_with_pages  # noqa: E402
+from ibis.driver import CachedDriver, Driver  # noqa: E402
 from ibis.layout import FALLBACK_BSS_SIZE, Layout  # noqa: E402
+from ibis.pages import PageMap  # noqa: E402
 from ibis.plugins import (  # noqa: E402
     ANALYZE_FAIL_MESSAGE,
     ANALYZE_FAIL_TITLE,
     ISSUES_URL,
     MISSING_BSS_BOUNDS,
+    find_functions,
+    probe_context,
 )
 
 
@@ -64,6 +69,7 @@ class IbisView(BinaryView):
         length: int,
         flags: int,
         semantics: SectionSemantics,
+        pages: PageMap | None = None,
     ):
         length = min(length, 1 << 21)  # Cap segment size to prevent denial of service.
         data_length = 0 if data_offset is None else length
@@ -71,13 +77,31 @@ class IbisView(BinaryView):
         if self.parent_view and data_offset:
             data_length = min(data_length, self.parent_view.length - data_offset)
 
+        # Trailing zero padding doesn't need to be backed by the file, since the
+        # rest of the segment is zero-filled anyway.
+        if pages and data_offset is not None:
+            data_end = pages.content_end(data_offset, data_offset + data_length)
+            data_length = data_end - data_offset
+
         # Conventionally, these should be auto segments/sections but since iBoot
         # can be a bit wonky, it's best to make them user segments so they can
         # be tweaked later without be clobbered on the next load.
         self.add_user_segment(start, length, data_offset or 0, data_length, flags)  # pyright: ignore[reportArgumentType]
         self.add_user_section(name, start, length, semantics)
 
-    def _apply_layout(self, layout: Layout):
+    def _apply_layout(self, layout: Layout, pages: PageMap):
+        # Segments are added in bulk so that the segment map is only rebuilt
+        # once, rather than after every segment.
+        self.begin_bulk_add_segments()
+        try:
+            self._add_layout_segments(layout, pages)
+        except Exception:
+            self.cancel_bulk_add_segments()
+            raise
+
+        self.end_bulk_add_segments()
+
+    def _add_layout_segments(self, layout: Layout, pages: PageMap):
         self._add_segment(
             "TEXT",
             layout.text.file_offset,
@@ -85,6 +109,7 @@ class IbisView(BinaryView):
             layout.text.size,
             SegmentFlag.SegmentReadable | SegmentFlag.SegmentExecutable,
             SectionSemantics.ReadOnlyCodeSectionSemantics,
+            pages,
         )
         self._add_segment(
             "CONST",
@@ -93,6 +118,7 @@ class IbisView(BinaryView):
             layout.const.size,
             SegmentFlag.SegmentReadable,
             SectionSemantics.ReadOnlyDataSectionSemantics,
+            pages,
         )
         self._add_segment(
             "DATA",
@@ -101,6 +127,7 @@ class IbisView(BinaryView):
             layout.data.size,
             SegmentFlag.SegmentReadable | SegmentFlag.SegmentWritable,
             SectionSemantics.ReadWriteDataSectionSemantics,
+            pages,
         )
 
         bss_start = layout.bss.start if layout.bss else layout.data.end
@@ -118,14 +145,28 @@ class IbisView(BinaryView):
             SectionSemantics.ReadWriteDataSectionSemantics,
         )
 
+    @contextmanager
+    def _bulk_update(self):
+        """
+        Make many changes to the view at once: analysis is held and undo actions
+        aren't recorded until the changes are done, so each change doesn't
+        trigger its own (re-)analysis and bookkeeping. Analysis is then run once
+        for everything.
+        """
+
+        self.set_analysis_hold(True)
+        undo = self.begin_undo_actions()
+        try:
+            with self.bulk_modify_symbols():
+                yield
+        finally:
+            self.forget_undo_actions(undo)
+            self.set_analysis_hold(False)
+            self.update_analysis()
+
     @classmethod
     def is_valid_for_data(cls, data: BinaryView) -> bool:
-        try:
-            BinjaDriver(data).detect_context()
-            return True
-        except Exception as e:
-            print(e)
-            return False
+        return probe_context(BinjaDriver(data)) is not None
 
     # @override
     def perform_get_address_size(self) -> int:
@@ -139,22 +180,33 @@ class IbisView(BinaryView):
         self.platform: Platform = Architecture["aarch64"].standalone_platform
         self.arch: Architecture = self.platform.arch
 
-        driver = BinjaDriver(self.parent_view)
-        layout = analyze(driver)
+        started = perf_counter()
+        driver = CachedDriver(BinjaDriver(self.parent_view))
+        layout, pages = analyze_with_pages(driver, probe_context(driver))
+        log_info(f"Analyzed layout in {perf_counter() - started:.3f}s")
 
         try:
-            self._apply_layout(layout)
+            self._apply_layout(layout, pages)
 
             if self.parse_only:
                 return True
 
-            # Analysis can get confused about function bounds when if it fails to
-            # detect no-return functions. A cheap hack is to create functions
-            # starting at every PACIBSP, which shouldn't ever appear in the middle
-            # of a function.
-            for addr in range(layout.text.start, layout.text.end, 4):
-                if self.read_int(addr, 4, False) == 0xD503237F:  # pacibsp
+            started = perf_counter()
+            functions = find_functions(driver, layout)
+            found = perf_counter()
+
+            with self._bulk_update():
+                for addr, name in functions.items():
                     self.add_function(addr)
+                    if name:
+                        self.define_auto_symbol(
+                            Symbol(SymbolType.FunctionSymbol, addr, name)
+                        )
+
+            log_info(
+                f"Found {len(functions)} functions in {found - started:.3f}s, "
+                f"created them in {perf_counter() - found:.3f}s"
+            )
 
             start = layout.text.start
 
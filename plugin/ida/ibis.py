@@ -1,14 +1,15 @@
 import sys
 from pathlib import Path
+from time import perf_counter
 
-import ida_bytes
+import ida_auto
 import ida_entry
-import ida_funcs
 import ida_ida
 import ida_idaapi
 import ida_idp
 import ida_kernwin
 import ida_loader
+import ida_name
 import ida_segment
 
 IBIS_PATH = Path(__file__).resolve().parent.parent.parent / "src"
@@ -17,12 +18,14 @@ if IBIS_PATH not in sys.path:
     sys.path.insert(0, str(IBIS_PATH))
 
 from ibis.analyzer import analyze  # noqa: E402
-from ibis.driver import Driver  # noqa: E402
+from ibis.driver import CachedDriver, Driver  # noqa: E402
 from ibis.layout import FALLBACK_BSS_SIZE, Layout  # noqa: E402
 from ibis.plugins import (  # noqa: E402
     ANALYZE_FAIL_MESSAGE,
     ISSUES_URL,
     MISSING_BSS_BOUNDS,
+    find_functions,
+    probe_context,
 )
 
 
@@ -42,14 +45,11 @@ class IDADriver(Driver):
 
 
 def accept_file(fd, _):
-    try:
-        ctx = IDADriver(fd).detect_context()
-
-        return {"format": f"{ctx.app.value}", "processor": "arm"}
-    except Exception as e:
-        print(e)
+    ctx = probe_context(IDADriver(fd))
+    if ctx is None:
+        return 0
 
-    return 0
+    return {"format": f"{ctx.app.value}", "processor": "arm"}
 
 
 input_size = None  # XXX: Global, set in `load_file`.
@@ -134,16 +134,26 @@ def load_file(fd, neflags: int, _):
     input_size = fd.tell()
 
     try:
-        layout = analyze(IDADriver(fd))
+        driver = CachedDriver(IDADriver(fd))
+
+        layout = analyze(driver, probe_context(driver))
         apply_layout(fd, layout)
 
-        # Analysis can get confused about function bounds when if it fails to detect
-        # no-return functions. A cheap hack is to create functions starting at every
-        # PACIBSP, which shouldn't ever appear in the middle of a function.
-        for addr in range(layout.text.start, layout.text.end, 4):
-            if ida_bytes.get_dword(addr) == 0xD503237F:  # pacibsp
-                print(f"Adding function @ {addr:#x}...")
-                ida_funcs.add_func(addr)
+        started = perf_counter()
+        functions = find_functions(driver, layout)
+
+        # Functions are queued for auto-analysis to create, rather than being
+        # created (and analyzed) one at a time up front.
+        for addr, name in functions.items():
+            ida_auto.auto_make_proc(addr)
+            if name:
+                ida_name.set_name(addr, name, ida_name.SN_NOWARN)
+
+        named = sum(1 for name in functions.values() if name)
+        print(
+            f"Queued {len(functions)} functions ({named} named) "
+            f"in {perf_counter() - started:.3f}s"
+        )
 
         start = layout.text.start
 
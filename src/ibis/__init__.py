@@ -0,0 +1,7 @@
+from importlib.metadata import PackageNotFoundError, version
+
+try:
+    __version__ = version("ibis")
+except PackageNotFoundError:
+    # Not installed, e.g. when loaded straight from a checkout by the plugins.
+    __version__ = "unknown"
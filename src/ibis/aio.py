@@ -0,0 +1,282 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from urllib.parse import urlsplit
+
+from ibis.analyzer import (
+    VERSION_MIN,
+    _heuristic_ranges,
+    _initial_ranges,
+    _parse_table,
+    analyze,
+)
+from ibis.driver import Driver, coalesce_ranges
+from ibis.layout import Layout
+
+
+class AsyncDriver(ABC):
+    """
+    Asynchronous counterpart of `Driver`, for images behind sources where each
+    read has significant latency, e.g. object stores or remote debuggers.
+    """
+
+    @abstractmethod
+    async def read(self, offset: int, size: int) -> bytes: ...
+
+    @abstractmethod
+    async def size(self) -> int: ...
+
+    async def read_many(self, ranges: Iterable[tuple[int, int]]) -> list[memoryview]:
+        """
+        Read several `(offset, size)` ranges, coalescing nearby ranges (see
+        `Driver.read_many`) and issuing the resulting reads concurrently.
+        """
+
+        ranges = list(ranges)
+        spans = coalesce_ranges(ranges)
+
+        results = await asyncio.gather(
+            *(self.read(start, end - start) for start, end, _ in spans)
+        )
+
+        views: list[memoryview] = [memoryview(b"")] * len(ranges)
+        for (start, _, members), data in zip(spans, results, strict=True):
+            for i in members:
+                offset, size = ranges[i]
+                views[i] = memoryview(data)[offset - start : offset - start + size]
+
+        return views
+
+
+_BLOCK_SIZE = 0x10000
+
+
+class _BridgeDriver(Driver):
+    """
+    Synchronous driver reading through an asynchronous one, for running the
+    (synchronous) analyzer on a worker thread.
+
+    Data is fetched in blocks and kept; blocks expected to be needed can be
+    fetched concurrently ahead of time with `prefetch`, and anything else is
+    fetched on demand via the event loop.
+    """
+
+    source: AsyncDriver
+    loop: asyncio.AbstractEventLoop
+
+    _loop_thread: int
+    _size: int | None
+    _blocks: dict[int, bytes]
+    _semaphore: asyncio.Semaphore
+
+    def __init__(self, source: AsyncDriver, concurrency: int) -> None:
+        super().__init__()
+
+        self.source = source
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+        self._size = None
+        self._blocks = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch(self, index: int):
+        async with self._semaphore:
+            data = await self.source.read(index * _BLOCK_SIZE, _BLOCK_SIZE)
+
+        self._blocks[index] = data
+
+    async def prefetch(self, ranges: Iterable[tuple[int, int]]):
+        """Concurrently fetch the blocks covering the given ranges."""
+
+        indices = set()
+        for offset, size in ranges:
+            end = offset + size
+            if self._size is not None:
+                end = min(end, self._size)
+
+            indices.update(range(offset // _BLOCK_SIZE, -(-end // _BLOCK_SIZE)))
+
+        await asyncio.gather(
+            *(self._fetch(i) for i in sorted(indices) if i not in self._blocks)
+        )
+
+    async def fetch_size(self):
+        self._size = await self.source.size()
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        size = max(min(size, self.size() - offset), 0)
+        if not size:
+            return b""
+
+        first, last = offset // _BLOCK_SIZE, (offset + size - 1) // _BLOCK_SIZE
+        if any(i not in self._blocks for i in range(first, last + 1)):
+            # Waiting on the event loop from its own thread would deadlock.
+            if threading.get_ident() == self._loop_thread:
+                raise RuntimeError("data must be prefetched to be read on the loop")
+
+            asyncio.run_coroutine_threadsafe(
+                self.prefetch([(offset, size)]), self.loop
+            ).result()
+
+        start = offset - first * _BLOCK_SIZE
+        if first == last:
+            return memoryview(self._blocks[first])[start : start + size]
+
+        data = b"".join(self._blocks[i] for i in range(first, last + 1))
+        return data[start : start + size]
+
+    # @override
+    def size(self) -> int:
+        assert self._size is not None
+        return self._size
+
+
+async def analyze_async(driver: AsyncDriver, concurrency: int = 8) -> Layout:
+    """
+    Analyze the image behind an asynchronous driver; the asynchronous
+    counterpart of `ibis.analyzer.analyze`, producing the same layout.
+
+    Independent reads are issued concurrently (up to `concurrency` at a time):
+    the size, header, and layout table first, then everything the layout
+    heuristics can be expected to read. The heuristics then run on a worker
+    thread against what has already been fetched.
+    """
+
+    bridge = _BridgeDriver(driver, concurrency)
+
+    await asyncio.gather(bridge.fetch_size(), bridge.prefetch(_initial_ranges(bridge)))
+
+    banner, tag, table = bridge.read_many(_initial_ranges(bridge))
+    context = bridge.parse_context(banner, tag)
+
+    # Unsupported images are left for the analyzer to reject.
+    if context.version.major >= VERSION_MIN:
+        await bridge.prefetch(_heuristic_ranges(context, _parse_table(table)))
+
+    return await asyncio.to_thread(analyze, bridge, context)
+
+
+async def analyze_many_async(
+    drivers: Iterable[AsyncDriver], concurrency: int = 4
+) -> list[Layout | BaseException]:
+    """
+    Analyze many images concurrently, with at most `concurrency` analyses in
+    progress at a time, returning each result (or the exception raised while
+    analyzing it) in the same order as the drivers.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(driver: AsyncDriver) -> Layout:
+        async with semaphore:
+            return await analyze_async(driver)
+
+    return await asyncio.gather(
+        *(run(driver) for driver in drivers), return_exceptions=True
+    )
+
+
+class HTTPRangeError(Exception):
+    pass
+
+
+class HTTPRangeDriver(AsyncDriver):
+    """
+    Driver for an image served over HTTP(S) by a server supporting range
+    requests, e.g. most object stores.
+
+    Each read is a separate request (on its own connection), so reads issued
+    concurrently are served concurrently.
+    """
+
+    url: str
+
+    _size: int | None
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._size = None
+
+    async def _request(
+        self, first: int, last: int
+    ) -> tuple[int, dict[str, str], bytes]:
+        parts = urlsplit(self.url)
+        secure = parts.scheme == "https"
+
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80), ssl=secure or None
+        )
+
+        try:
+            target = parts.path or "/"
+            if parts.query:
+                target += f"?{parts.query}"
+
+            request = (
+                f"GET {target} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                f"Range: bytes={first}-{last}\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+            )
+            writer.write(request.encode())
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if headers.get("transfer-encoding", "identity") != "identity":
+                raise HTTPRangeError("chunked responses are not supported")
+
+            if "content-length" in headers:
+                body = await reader.readexactly(int(headers["content-length"]))
+            else:
+                body = await reader.read()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+        return status, headers, body
+
+    # @override
+    async def size(self) -> int:
+        if self._size is None:
+            status, headers, body = await self._request(0, 0)
+
+            if status == 206:
+                self._size = int(headers["content-range"].rpartition("/")[2])
+            elif status == 200:
+                self._size = len(body)
+            else:
+                raise HTTPRangeError(f"unexpected status {status} for {self.url}")
+
+        return self._size
+
+    # @override
+    async def read(self, offset: int, size: int) -> bytes:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        size = min(size, await self.size() - offset)
+        if size <= 0:
+            return b""
+
+        status, _, body = await self._request(offset, offset + size - 1)
+
+        # Servers are free to ignore the range and send everything instead.
+        if status == 206:
+            return body
+        if status == 200:
+            return body[offset : offset + size]
+
+        raise HTTPRangeError(f"unexpected status {status} for {self.url}")
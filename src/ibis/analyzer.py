@@ -4,6 +4,7 @@ import struct
 from ibis.context import App, Context
 from ibis.driver import Driver
 from ibis.layout import Layout, Region
+from ibis.pages import PageKind, PageMap
 
 
 class UnsupportedVersionError(Exception):
@@ -22,22 +23,43 @@ def _align_up(v: int, size: int) -> int:
     return _align_down(v + size - 1, size)
 
 
+def _segment_start(pages: PageMap, prev_end: int) -> int:
+    """
+    Get the file offset where a segment following one that ends at the given
+    offset starts, i.e. at the next page boundary.
+
+    The page size is not the same on all devices, so rather than keeping a
+    mapping of target to page size, round up to a 4K page first and check what
+    lies between there and the next 16K boundary. If it is all padding (zero
+    or fill pages), then the 4K boundary is still within the previous segment's
+    padding, and the segment must start at the 16K boundary instead.
+    """
+
+    start = _align_up(prev_end, 0x1000)
+    end = _align_up(start, 0x4000)
+
+    if start < end and all(
+        kind != PageKind.CONTENT for _, _, kind in pages.runs(start, end)
+    ):
+        return end
+
+    return start
+
+
 _LAYOUT_TABLE_OFFSET = 0x300
+_LAYOUT_TABLE_COUNT = 12
 
 
-def _read_table(driver: Driver, count: int) -> list[int]:
+def _parse_table(data: bytes | memoryview) -> list[int]:
     """
-    Read the "layout table" embedded in the binary, which contains some helpful
+    Parse the "layout table" embedded in the binary, which contains some helpful
     region information.
 
     Earlier versions of the layout table with pointers to the banner/tag strings
     will automatically have the first 3 elements (string pointers) removed.
     """
 
-    table = [
-        struct.unpack("q", driver.read(_LAYOUT_TABLE_OFFSET + (i * 8), 8))[0]
-        for i in range(count)
-    ]
+    table = list(struct.unpack(f"{_LAYOUT_TABLE_COUNT}q", data))
 
     if table[0] & 0xFFF != 0:
         logging.debug("Ignoring first 3 elements of layout table... (old format)")
@@ -49,7 +71,9 @@ def _read_table(driver: Driver, count: int) -> list[int]:
     return table
 
 
-def _detect_layout_v1585(context: Context, driver: Driver) -> Layout:
+def _detect_layout_v1585(
+    context: Context, driver: Driver, pages: PageMap, table: list[int]
+) -> Layout:
     """
     Detect the layout of images newer than major verison 1585.
     """
@@ -65,7 +89,6 @@ def _detect_layout_v1585(context: Context, driver: Driver) -> Layout:
     #   6: BSS Start
     #   7: BSS End
     #
-    table = _read_table(driver, 12)
 
     const_end_offset = table[2]
 
@@ -97,17 +120,8 @@ def _detect_layout_v1585(context: Context, driver: Driver) -> Layout:
     text = Region(table[0], const_start_addr, 0)
     const = Region(const_start_addr, const_end_addr, const_start_offset)
 
-    # DATA should always start at a page boundary, but the page size is not the
-    # same on all devices...
-    data_start_offset = _align_up(const_end_offset, 0x1000)
-
-    # As a cheap hack to avoid keeping a mapping of target to page size, we can
-    # try first rounding up to a 4K page and reading the following page. If the
-    # page is full of zeroes, then we are probably still within the segment
-    # padding and should round up to the 16K boundary instead.
-    data_first_4k = driver.read(data_start_offset, 0x1000)
-    if all(b == 0 for b in data_first_4k):
-        data_start_offset = _align_up(data_start_offset, 0x4000)
+    # DATA should always start at a page boundary, past CONST's padding.
+    data_start_offset = _segment_start(pages, const_end_offset)
 
     data = Region(table[4], table[5], data_start_offset)
     bss = Region(table[6], table[7])
@@ -115,7 +129,9 @@ def _detect_layout_v1585(context: Context, driver: Driver) -> Layout:
     return Layout(text, const, data, bss)
 
 
-def _detect_layout_v6823(context: Context, driver: Driver) -> Layout:
+def _detect_layout_v6823(
+    context: Context, driver: Driver, pages: PageMap, table: list[int]
+) -> Layout:
     """
     Detect the layout of images newer than major verison 6823.
     """
@@ -130,7 +146,6 @@ def _detect_layout_v6823(context: Context, driver: Driver) -> Layout:
     #   7: DATA End / BSS Start
     #   8: BSS End
     #
-    table = _read_table(driver, 12)
 
     # CONST end is stored as an address in these newer versions, but we can rely
     # on it being contiguous with TEXT, so just take the difference from TEXT
@@ -168,12 +183,8 @@ def _detect_layout_v6823(context: Context, driver: Driver) -> Layout:
     const_start_offset = _align_down(const_start_offset, 0x10)
     const_start_addr = table[0] + const_start_offset
 
-    const_end_offset = _align_up(table[2] - table[0], 0x1000)
-
-    # See explanation in function above; we need to guess the page size.
-    data_first_4k = driver.read(const_end_offset, 0x1000)
-    if all(b == 0 for b in data_first_4k):
-        const_end_offset = _align_up(const_end_offset, 0x4000)
+    # CONST runs up to DATA, which starts at a page boundary past its padding.
+    const_end_offset = _segment_start(pages, table[2] - table[0])
 
     const_end_addr = table[0] + const_end_offset
 
@@ -197,17 +208,86 @@ def _detect_layout_v6823(context: Context, driver: Driver) -> Layout:
 VERSION_MIN = 1585  # Earliest 64-bit ROM (A7)
 
 
-def analyze(driver: Driver) -> Layout:
-    ctx = driver.detect_context()
+def _initial_ranges(driver: Driver) -> list[tuple[int, int]]:
+    """Get the ranges of the banner, build tag, and layout table."""
+
+    return [
+        *driver.header_ranges(),
+        (_LAYOUT_TABLE_OFFSET, _LAYOUT_TABLE_COUNT * 8),
+    ]
+
+
+# How much of the search for the start of CONST to fetch ahead of time.
+_SEARCH_PREFETCH_SIZE = 0x40000
+
+
+def _heuristic_ranges(context: Context, table: list[int]) -> list[tuple[int, int]]:
+    """
+    Get the ranges the layout heuristics (see above) can be expected to read,
+    so that they can be fetched ahead of time: where the search for the start
+    of CONST begins, and the pages probed to guess the page size.
+
+    These are only hints; the heuristics will still read anything else they
+    need (e.g. the rest of a long search).
+    """
+
+    if context.version.major >= 6823:
+        const_end_offset = table[2] - table[0]
+
+        # Searched forwards from the start of the image.
+        search = (0, min(const_end_offset, _SEARCH_PREFETCH_SIZE))
+    else:
+        const_end_offset = table[2]
+
+        # Searched backwards from the end of CONST.
+        search_start = max(0, const_end_offset - _SEARCH_PREFETCH_SIZE)
+        search = (search_start, const_end_offset - search_start)
+
+    # Everything up to the next 16K boundary may be probed as padding.
+    probe = _align_up(const_end_offset, 0x1000)
+    probe_end = _align_up(probe, 0x4000)
+    return [
+        search,
+        (probe, max(probe_end - probe, 0x1000)),
+        (probe_end, 0x1000),
+    ]
+
+
+def analyze_with_pages(
+    driver: Driver, context: Context | None = None
+) -> tuple[Layout, PageMap]:
+    """
+    Analyze the layout of an image (see `analyze`), also returning the page
+    classification of the image.
+
+    The page map classifies pages on demand, so it references the driver, and
+    can only be queried while the driver is open.
+    """
+
+    if context is None:
+        # Everything needed up front is close together at the start of the
+        # image, so it can all be read at once.
+        banner, tag, table_data = driver.read_many(_initial_ranges(driver))
+        ctx = driver.parse_context(banner, tag)
+    else:
+        ctx = context
+        table_data = driver.read(_LAYOUT_TABLE_OFFSET, _LAYOUT_TABLE_COUNT * 8)
+
     logging.info(f"Detected {ctx.app} version {ctx.version}.")
 
     if ctx.version.major < VERSION_MIN:
         raise UnsupportedVersionError(ctx.version)
 
+    # Pages are only classified as the heuristics probe them, but the map is
+    # returned so that the rest can be classified later if needed.
+    pages = PageMap(driver)
+
+    table = _parse_table(table_data)
+
     if ctx.version.major >= 6823:
-        layout = _detect_layout_v6823(ctx, driver)
+        layout = _detect_layout_v6823(ctx, driver, pages, table)
     else:
-        layout = _detect_layout_v1585(ctx, driver)
+        layout = _detect_layout_v1585(ctx, driver, pages, table)
 
     for name, region in layout.regions():
         logging.debug(f"Resolved region {name}: {region}")
@@ -215,4 +295,16 @@ def analyze(driver: Driver) -> Layout:
     logging.info("Validating layout...")
     layout.validate()
 
+    return layout, pages
+
+
+def analyze(driver: Driver, context: Context | None = None) -> Layout:
+    """
+    Analyze the layout of an image.
+
+    If the image's context has already been detected, it can be passed in to
+    avoid detecting it again.
+    """
+
+    layout, _ = analyze_with_pages(driver, context)
     return layout
@@ -0,0 +1,443 @@
+import io
+import struct
+import tarfile
+import zipfile
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Iterator
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from ibis.driver import Driver
+from ibis.search import Haystack
+
+
+class ArchiveError(Exception):
+    pass
+
+
+ARCHIVE_SEPARATOR = "!"
+"""Separator between an archive's path and a member name, e.g. `a.ipsw!iBoot`."""
+
+_ZIP_MAGIC = b"PK\x03\x04"
+_ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_TAR_MAGIC_OFFSET = 257
+_TAR_MAGIC = b"ustar"
+
+# Decompression state is checkpointed (roughly) every this many bytes of
+# output, which bounds how much has to be decompressed to serve a read.
+_CHECKPOINT_SPACING = 1 << 20
+_INFLATE_CHUNK_SIZE = 0x4000
+
+
+def split_archive_path(path: str | Path) -> tuple[Path, str | None]:
+    """
+    Split a path to an archive member (see `ARCHIVE_SEPARATOR`) into the path
+    of the archive and the member name or glob, which is `None` if the path
+    isn't to an archive member.
+    """
+
+    path = str(path)
+
+    archive, separator, member = path.partition(ARCHIVE_SEPARATOR)
+    if not separator or Path(path).exists():
+        return Path(path), None
+
+    return Path(archive), member
+
+
+class _DriverIO(io.RawIOBase):
+    """Seekable, read-only file object reading through a driver."""
+
+    def __init__(self, driver: Driver) -> None:
+        super().__init__()
+
+        self.driver = driver
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.driver.size()
+
+        self.position = offset
+        return offset
+
+    def readinto(self, buffer) -> int:
+        count = self.driver.read_into(self.position, buffer)
+        self.position += count
+
+        return count
+
+
+class _SliceDriver(Driver):
+    """Driver for a range of the data behind another driver."""
+
+    def __init__(self, source: Driver, offset: int, size: int) -> None:
+        super().__init__()
+
+        self.source = source
+        self.offset = offset
+        self._size = size
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        size = max(min(size, self._size - offset), 0)
+        return self.source.read(self.offset + offset, size)
+
+    # @override
+    def window(self, offset: int, size: int) -> tuple[Haystack, int, int]:
+        size = max(min(size, self._size - offset), 0)
+        return self.source.window(self.offset + offset, size)
+
+    # @override
+    def size(self) -> int:
+        return self._size
+
+
+class InflateDriver(Driver):
+    """
+    Driver for DEFLATE-compressed data behind another driver, supporting
+    random access.
+
+    Decompression state is checkpointed periodically as the data is
+    decompressed, so a read only has to decompress from the closest preceding
+    checkpoint, rather than from the start of the stream. The most recently
+    used spans between checkpoints are also kept, so nearby reads (e.g. by a
+    chunked search) don't decompress the same span repeatedly.
+    """
+
+    source: Driver
+
+    _offset: int
+    _length: int
+    _size: int | None
+    _complete: bool
+
+    # Output offset, input offset, and decompressor state at each checkpoint.
+    _outputs: list[int]
+    _inputs: list[int]
+    _states: list["zlib._Decompress"]
+
+    _spans: OrderedDict[int, bytes]
+    _capacity: int
+
+    def __init__(
+        self,
+        source: Driver,
+        offset: int = 0,
+        length: int | None = None,
+        size: int | None = None,
+        wbits: int = -zlib.MAX_WBITS,
+        capacity: int = 8,
+    ) -> None:
+        """
+        Create a driver for the `length` bytes of compressed data at `offset`,
+        which decompress to `size` bytes (determined by decompressing all of
+        it, if necessary).
+
+        Use `wbits=-15` for raw DEFLATE data (e.g. from ZIP files), or
+        `wbits=31` for gzip-wrapped data.
+        """
+
+        super().__init__()
+
+        self.source = source
+
+        self._offset = offset
+        self._length = source.size() - offset if length is None else length
+        self._size = size
+        self._complete = False
+
+        self._outputs = [0]
+        self._inputs = [0]
+        self._states = [zlib.decompressobj(wbits)]
+
+        self._spans = OrderedDict()
+        self._capacity = capacity
+
+    def _extend(self):
+        """Decompress the next span of data, adding a checkpoint at its end."""
+
+        state = self._states[-1].copy()
+        cursor = self._inputs[-1]
+
+        chunks = []
+        produced = 0
+        while produced < _CHECKPOINT_SPACING and not state.eof:
+            size = min(_INFLATE_CHUNK_SIZE, self._length - cursor)
+            if size <= 0:
+                break
+
+            # Limit the output, as highly compressible data could otherwise
+            # produce far more than the spacing from a single chunk; input
+            # left unconsumed is read again next time around.
+            chunk = state.decompress(
+                self.source.read(self._offset + cursor, size),
+                _CHECKPOINT_SPACING - produced,
+            )
+            cursor += size - len(state.unconsumed_tail)
+
+            chunks.append(chunk)
+            produced += len(chunk)
+
+        if not produced:
+            self._complete = True
+            return
+
+        if state.eof or cursor >= self._length:
+            self._complete = True
+
+        self._remember(len(self._outputs) - 1, b"".join(chunks))
+
+        self._outputs.append(self._outputs[-1] + produced)
+        self._inputs.append(cursor)
+        self._states.append(state)
+
+    def _remember(self, index: int, span: bytes):
+        self._spans[index] = span
+        if len(self._spans) > self._capacity:
+            self._spans.popitem(last=False)
+
+    def _span(self, index: int) -> bytes:
+        """Get the decompressed data between two consecutive checkpoints."""
+
+        if (span := self._spans.get(index)) is not None:
+            self._spans.move_to_end(index)
+            return span
+
+        state = self._states[index].copy()
+        start, end = self._inputs[index], self._inputs[index + 1]
+
+        # The decompressor may have consumed input at the next checkpoint for
+        # output beyond it, which belongs to the next span.
+        data = state.decompress(
+            self.source.read(self._offset + start, end - start),
+            self._outputs[index + 1] - self._outputs[index],
+        )
+        self._remember(index, data)
+
+        return data
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        end = offset + size
+        while not self._complete and self._outputs[-1] < end:
+            self._extend()
+
+        index = bisect_right(self._outputs, offset) - 1
+
+        parts = []
+        while index < len(self._outputs) - 1 and self._outputs[index] < end:
+            base = self._outputs[index]
+            span = memoryview(self._span(index))
+            parts.append(span[max(offset - base, 0) : end - base])
+            index += 1
+
+        if len(parts) == 1:
+            return parts[0]
+
+        return b"".join(parts)
+
+    # @override
+    def size(self) -> int:
+        if self._size is None:
+            while not self._complete:
+                self._extend()
+
+            self._size = self._outputs[-1]
+
+        return self._size
+
+
+class _MemberDriver(Driver):
+    """Base class for drivers exposing an archive member's data."""
+
+    source: Driver
+
+    name: str
+    """Name of the member within the archive."""
+
+    _data: Driver
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        return self._data.read(offset, size)
+
+    # @override
+    def read_into(self, offset: int, buffer: bytearray | memoryview) -> int:
+        return self._data.read_into(offset, buffer)
+
+    # @override
+    def window(self, offset: int, size: int) -> tuple[Haystack, int, int]:
+        return self._data.window(offset, size)
+
+    # @override
+    def size(self) -> int:
+        return self._data.size()
+
+    @staticmethod
+    def _select(names: list[str], pattern: str) -> str:
+        if pattern in names:
+            return pattern
+
+        matches = [name for name in names if fnmatchcase(name, pattern)]
+        if len(matches) != 1:
+            raise ArchiveError(
+                f"expected one member matching {pattern!r}, found {len(matches)}"
+            )
+
+        return matches[0]
+
+
+class ZipMemberDriver(_MemberDriver):
+    """
+    Driver for a member of a ZIP archive (e.g. an IPSW), selected by name or
+    glob pattern, which must match exactly one member.
+
+    Stored members are read directly from the archive; deflated members are
+    decompressed on demand (see `InflateDriver`).
+    """
+
+    def __init__(self, source: Driver, member: str) -> None:
+        super().__init__()
+
+        self.source = source
+
+        infos = {info.filename: info for info in self._infos(source)}
+
+        info = infos[self._select(list(infos), member)]
+        self.name = info.filename
+
+        if info.flag_bits & 0x1:
+            raise ArchiveError(f"member is encrypted: {self.name}")
+
+        header = bytes(source.read(info.header_offset, _ZIP_LOCAL_HEADER.size))
+        if len(header) < _ZIP_LOCAL_HEADER.size or not header.startswith(_ZIP_MAGIC):
+            raise ArchiveError(f"bad local header for member: {self.name}")
+
+        _, name_size, extra_size = _ZIP_LOCAL_HEADER.unpack(header)
+        offset = info.header_offset + _ZIP_LOCAL_HEADER.size + name_size + extra_size
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            self._data = _SliceDriver(source, offset, info.file_size)
+        elif info.compress_type == zipfile.ZIP_DEFLATED:
+            self._data = InflateDriver(
+                source, offset, info.compress_size, info.file_size
+            )
+        else:
+            raise ArchiveError(
+                f"unsupported compression ({info.compress_type}) for member: {self.name}"
+            )
+
+    @staticmethod
+    def _infos(source: Driver) -> list[zipfile.ZipInfo]:
+        try:
+            with zipfile.ZipFile(_DriverIO(source)) as archive:
+                return [info for info in archive.infolist() if not info.is_dir()]
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f"failed to read ZIP archive: {e}") from e
+
+    @classmethod
+    def names(cls, source: Driver) -> list[str]:
+        """List the names of the (file) members of the archive."""
+
+        return [info.filename for info in cls._infos(source)]
+
+
+class TarMemberDriver(_MemberDriver):
+    """
+    Driver for a member of a (optionally gzip-compressed) tar archive,
+    selected by name or glob pattern, which must match exactly one member.
+
+    Members of compressed archives are read from the decompressed stream on
+    demand (see `InflateDriver`); locating a member still requires
+    decompressing everything before it, but nothing after it.
+    """
+
+    def __init__(self, source: Driver, member: str) -> None:
+        super().__init__()
+
+        self.source = source
+
+        stream = self._stream(source)
+
+        # Stop looking as soon as an exact match is found, so that nothing
+        # after it needs to be decompressed.
+        infos = {}
+        for info in self._infos(stream):
+            infos[info.name] = info
+            if info.name == member:
+                break
+
+        info = infos[self._select(list(infos), member)]
+        self.name = info.name
+
+        self._data = _SliceDriver(stream, info.offset_data, info.size)
+
+    @staticmethod
+    def _stream(source: Driver) -> Driver:
+        if bytes(source.read(0, len(_GZIP_MAGIC))) == _GZIP_MAGIC:
+            return InflateDriver(source, wbits=zlib.MAX_WBITS | 16)
+
+        return source
+
+    @staticmethod
+    def _infos(stream: Driver) -> Iterator[tarfile.TarInfo]:
+        try:
+            with tarfile.open(fileobj=_DriverIO(stream), mode="r:") as archive:
+                yield from (info for info in archive if info.isfile())
+        except tarfile.TarError as e:
+            raise ArchiveError(f"failed to read tar archive: {e}") from e
+
+    @classmethod
+    def names(cls, source: Driver) -> list[str]:
+        """List the names of the (file) members of the archive."""
+
+        return [info.name for info in cls._infos(cls._stream(source))]
+
+
+def _member_driver_class(source: Driver) -> type[ZipMemberDriver | TarMemberDriver]:
+    header = bytes(source.read(0, _TAR_MAGIC_OFFSET + len(_TAR_MAGIC)))
+
+    if header.startswith(_ZIP_MAGIC):
+        return ZipMemberDriver
+    if header.startswith(_GZIP_MAGIC) or header[_TAR_MAGIC_OFFSET:] == _TAR_MAGIC:
+        return TarMemberDriver
+
+    raise ArchiveError("unsupported archive format")
+
+
+def open_member(source: Driver, member: str) -> ZipMemberDriver | TarMemberDriver:
+    """
+    Open a driver for an archive member, selected by name or glob pattern,
+    choosing the appropriate driver for the archive's format.
+    """
+
+    return _member_driver_class(source)(source, member)
+
+
+def match_members(source: Driver, pattern: str) -> list[str]:
+    """List the names of archive members matching a glob pattern."""
+
+    names = _member_driver_class(source).names(source)
+    return [name for name in names if fnmatchcase(name, pattern)]
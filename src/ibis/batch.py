@@ -0,0 +1,230 @@
+import glob
+import os
+import signal
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ibis.archive import (
+    ARCHIVE_SEPARATOR,
+    ArchiveError,
+    match_members,
+    open_member,
+    split_archive_path,
+)
+from ibis.cache import LayoutCache, analyze_cached
+from ibis.context import Context
+from ibis.driver import BinaryIODriver, Driver, InstrumentedDriver, MmapDriver
+from ibis.im4p import Im4pDriver, is_im4p
+from ibis.layout import Layout
+from ibis.names import identify_functions
+from ibis.scan import find_starts
+
+
+class AnalysisTimeoutError(Exception):
+    pass
+
+
+def is_glob(pattern: str) -> bool:
+    """Check whether a path (or member name) contains any glob wildcards."""
+
+    return any(c in pattern for c in "*?[")
+
+
+def _expand_members(archive: Path, pattern: str) -> Iterator[Path]:
+    if not archive.exists() and is_glob(str(archive)):
+        for match in sorted(glob.glob(str(archive), recursive=True)):
+            yield from _expand_members(Path(match), pattern)
+        return
+
+    names = [pattern]
+    if is_glob(pattern) and archive.is_file():
+        try:
+            with archive.open("rb") as f, MmapDriver(f) as driver:
+                names = match_members(driver, pattern)
+        except ArchiveError:
+            pass
+
+    for name in names:
+        yield Path(f"{archive}{ARCHIVE_SEPARATOR}{name}")
+
+
+def expand_inputs(inputs: Iterable[str]) -> Iterator[Path]:
+    """
+    Expand a list of inputs, which may be files, directories (searched
+    recursively), glob patterns, or archive members (e.g. `a.ipsw!iBoot*`,
+    see `split_archive_path`), into the paths of the files to analyze.
+
+    Inputs which don't exist are passed through as-is, so that they can be
+    reported as errors alongside everything else.
+    """
+
+    for input in inputs:
+        path = Path(input)
+
+        archive, member = split_archive_path(input)
+        if member is not None:
+            yield from _expand_members(archive, member)
+        elif path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.is_file())
+        elif not path.exists() and is_glob(input):
+            for match in sorted(glob.glob(input, recursive=True)):
+                yield from expand_inputs([match])
+        else:
+            yield path
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """
+    Raise `AnalysisTimeoutError` if the body doesn't finish within the given
+    number of seconds.
+
+    Relies on `SIGALRM`, so only works on the main thread of POSIX systems;
+    elsewhere, no deadline is enforced.
+    """
+
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def expire(*_):
+        raise AnalysisTimeoutError(f"timed out after {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def open_driver(path: Path) -> Iterator[Driver]:
+    """
+    Open a driver for the image in the file (or archive member, see
+    `split_archive_path`) at the given path, unwrapping the payload of IM4P
+    (or IMG4) containers.
+    """
+
+    archive, member = split_archive_path(path)
+
+    with archive.open("rb") as f, ExitStack() as stack:
+        # Empty files can't be mapped, but are otherwise just like any other
+        # file that isn't an image.
+        source: Driver = (
+            stack.enter_context(MmapDriver(f))
+            if os.fstat(f.fileno()).st_size
+            else BinaryIODriver(f)
+        )
+
+        driver = source if member is None else open_member(source, member)
+        yield Im4pDriver(driver) if is_im4p(driver) else driver
+
+
+def result_dict(context: Context, layout: Layout) -> dict[str, Any]:
+    """Get the JSON representation of an analysis result."""
+
+    return {**context.to_dict(), "regions": layout.to_dict()}
+
+
+@dataclass
+class AnalysisOptions:
+    """Options controlling how each input is analyzed and what is reported."""
+
+    timeout: float | None = None
+    """Give up on an input if analysis takes longer than this many seconds."""
+
+    cache: LayoutCache | None = None
+    """Cache to reuse results from, if any."""
+
+    functions: bool = False
+    """Include the function starts found in TEXT (see `ibis.scan.find_starts`)."""
+
+    names: bool = False
+    """Include the addresses of known functions identified (see `ibis.names`)."""
+
+    stats: bool = False
+    """Include I/O statistics (see `InstrumentedDriver`)."""
+
+
+def analyze_driver(driver: Driver, options: AnalysisOptions) -> dict[str, Any]:
+    """
+    Analyze the image behind a driver, returning the JSON representation of
+    the result (see `result_dict`) plus anything else requested by the
+    options.
+    """
+
+    if options.stats:
+        driver = InstrumentedDriver(driver)
+
+    context, layout = analyze_cached(driver, options.cache)
+    record = result_dict(context, layout)
+
+    if options.functions:
+        record["functions"] = find_starts(driver, layout).tolist()
+    if options.names:
+        record["names"] = identify_functions(driver, layout)
+    if isinstance(driver, InstrumentedDriver):
+        record["stats"] = driver.stats().to_dict()
+
+    return record
+
+
+def analyze_path(path: Path, options: AnalysisOptions | None = None) -> dict[str, Any]:
+    """
+    Analyze the file at the given path (see `analyze_driver`), returning the
+    result with an additional `path` field.
+
+    If analysis fails, the record will contain an `error` field describing the
+    failure instead of the result.
+    """
+
+    options = options or AnalysisOptions()
+    record: dict[str, Any] = {"path": str(path)}
+
+    try:
+        with deadline(options.timeout), open_driver(path) as driver:
+            record.update(analyze_driver(driver, options))
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    return record
+
+
+def analyze_paths(
+    paths: Iterable[Path], jobs: int = 1, options: AnalysisOptions | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Analyze many files using a pool of `jobs` worker processes, yielding each
+    result record (see `analyze_path`) as soon as it is available.
+
+    Records are yielded in order of completion, not input order.
+    """
+
+    if jobs <= 1:
+        for path in paths:
+            yield analyze_path(path, options)
+        return
+
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = {pool.submit(analyze_path, path, options): path for path in paths}
+
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. it ran out of memory, or crashed in native
+                # code), taking the pool with it; every input left unfinished is
+                # reported as a failure, rather than ending the stream.
+                record = {
+                    "path": str(futures[future]),
+                    "error": f"{type(e).__name__}: {e}",
+                }
+
+            yield record
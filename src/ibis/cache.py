@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import tempfile
+from hashlib import sha256
+from pathlib import Path
+
+from ibis import __version__
+from ibis.analyzer import analyze
+from ibis.context import Context
+from ibis.driver import Driver
+from ibis.layout import Layout
+
+DEFAULT_MAX_SIZE = 16 << 20
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def content_hash(driver: Driver) -> str:
+    """Get the SHA-256 digest of everything readable through the driver."""
+
+    digest = sha256()
+
+    size = driver.size()
+    for offset in range(0, size, _HASH_CHUNK_SIZE):
+        digest.update(driver.read(offset, min(_HASH_CHUNK_SIZE, size - offset)))
+
+    return digest.hexdigest()
+
+
+def _default_path() -> Path:
+    if cache_home := os.environ.get("XDG_CACHE_HOME"):
+        return Path(cache_home) / "ibis"
+
+    return Path.home() / ".cache" / "ibis"
+
+
+class LayoutCache:
+    """
+    On-disk cache of analysis results, keyed by image content.
+
+    Each entry is a small JSON file holding the serialized context and layout
+    of one image. Entries are also keyed by the Ibis version that produced
+    them, so that results are never reused across analyzer changes. Once the
+    cache grows beyond `max_size` bytes, the least recently used entries are
+    evicted.
+    """
+
+    path: Path
+    max_size: int
+
+    _size: int | None
+
+    def __init__(self, path: Path | None = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = path or _default_path()
+        self.max_size = max_size
+
+        self._size = None
+
+    @classmethod
+    def from_env(cls) -> "LayoutCache":
+        """
+        Get the cache at the location and with the size limit given by the
+        `IBIS_CACHE_DIR` and `IBIS_CACHE_SIZE` environment variables, if set.
+        """
+
+        path = os.environ.get("IBIS_CACHE_DIR")
+        size = os.environ.get("IBIS_CACHE_SIZE")
+
+        return cls(
+            Path(path) if path else None,
+            int(size, 0) if size else DEFAULT_MAX_SIZE,
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}-{__version__}.json"
+
+    def _entries(self) -> list[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.path) if e.name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def get(self, key: str) -> tuple[Context, Layout] | None:
+        """Get the cached result for the given content hash, if present."""
+
+        path = self._entry_path(key)
+
+        try:
+            entry = json.loads(path.read_text())
+            result = (
+                Context.from_dict(entry["context"]),
+                Layout.from_dict(entry["layout"]),
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding malformed cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # Entries are evicted by modification time, so touch this one to mark
+        # it as recently used.
+        os.utime(path)
+
+        return result
+
+    def put(self, key: str, context: Context, layout: Layout):
+        """Store the result for the given content hash."""
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        path = self._entry_path(key)
+        data = json.dumps({"context": context.to_dict(), "layout": layout.to_dict()})
+
+        # Write atomically, as other processes (and threads) may be sharing the
+        # cache; each writer gets its own temporary file.
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path, suffix=".tmp", delete=False
+        ) as f:
+            f.write(data)
+
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+
+        if self._size is None:
+            self._size = sum(e.stat().st_size for e in self._entries())
+        else:
+            self._size += len(data)
+
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+
+        self._size = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if self._size <= self.max_size:
+                break
+
+            logging.debug(f"Evicting cache entry {entry.name}")
+            Path(entry.path).unlink(missing_ok=True)
+            self._size -= entry.stat().st_size
+
+    def clear(self):
+        """Remove all cache entries."""
+
+        for entry in self._entries():
+            Path(entry.path).unlink(missing_ok=True)
+
+        self._size = 0
+
+
+def default_cache(enabled: bool | None = None) -> LayoutCache | None:
+    """
+    Get the default cache (see `LayoutCache.from_env`), or `None` if caching
+    is disabled.
+
+    Caching is opt-in; unless `enabled` says otherwise, it is enabled by
+    setting the `IBIS_CACHE` environment variable to a non-zero value.
+    """
+
+    if enabled is None:
+        enabled = os.environ.get("IBIS_CACHE", "0") not in ["", "0"]
+
+    return LayoutCache.from_env() if enabled else None
+
+
+def analyze_cached(driver: Driver, cache: LayoutCache | None) -> tuple[Context, Layout]:
+    """
+    Detect the context and analyze the layout of an image, reusing a cached
+    result for identical content if possible.
+    """
+
+    if cache is None:
+        context = driver.detect_context()
+        return context, analyze(driver, context)
+
+    key = content_hash(driver)
+    if result := cache.get(key):
+        logging.info(f"Using cached result for {key[:7]}.")
+        return result
+
+    context = driver.detect_context()
+    layout = analyze(driver, context)
+
+    cache.put(key, context, layout)
+
+    return context, layout
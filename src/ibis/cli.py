@@ -1,10 +1,22 @@
 import json
 import logging
-from argparse import ArgumentParser
+import os
+import sys
+from argparse import ArgumentParser, BooleanOptionalAction
 from pathlib import Path
 
-from ibis.analyzer import analyze
-from ibis.driver import BinaryIODriver
+from ibis.archive import split_archive_path
+from ibis.batch import (
+    AnalysisOptions,
+    analyze_driver,
+    analyze_paths,
+    deadline,
+    expand_inputs,
+    is_glob,
+    open_driver,
+)
+from ibis.cache import LayoutCache, default_cache
+from ibis.driver import DriverStats
 from ibis.layout import Layout, Region
 
 
@@ -27,12 +39,153 @@ def _print_layout(layout: Layout):
         _print_region("BSS", layout.bss)
 
 
-def main():
-    parser = ArgumentParser()
+def _print_record(record: dict, options: AnalysisOptions):
+    print(f"{record['app']}/{record['version']}/{record['target']}\n")
+    _print_layout(Layout.from_dict(record["regions"]))
+
+    if options.functions:
+        print()
+        for addr in record["functions"]:
+            print(f"{'FUNCTION':<12s}{addr:#08x}")
+
+    if options.names:
+        print()
+        for name, addr in record["names"].items():
+            print(f"{'NAME':<12s}{addr:#08x}  {name}")
+
+    if options.stats:
+        print(f"\n{DriverStats.format_dict(record['stats'])}", file=sys.stderr)
+
+
+def _main_batch(args, options: AnalysisOptions) -> int:
+    paths = list(expand_inputs(args.inputs))
+
+    failures = 0
+    for record in analyze_paths(paths, args.jobs, options):
+        if "error" in record:
+            failures += 1
+
+        if args.json:
+            print(json.dumps(record), flush=True)
+        elif "error" in record:
+            print(f"{record['path']}: {record['error']}\n", flush=True)
+        else:
+            print(f"{record['path']}: ", end="")
+            _print_record(record, options)
+            print(flush=True)
+
+    return 1 if failures else 0
+
+
+def _main_serve(argv: list[str]) -> int:
+    parser = ArgumentParser(prog="ibis serve")
+    parser.add_argument(
+        "-u",
+        "--socket",
+        metavar="PATH",
+        type=Path,
+        help="listen for requests on a Unix domain socket",
+    )
+    parser.add_argument(
+        "-p",
+        "--http",
+        metavar="PORT",
+        type=int,
+        help="listen for requests over HTTP on a localhost port",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        metavar="N",
+        type=int,
+        help="number of requests to handle and analyze concurrently "
+        "(default: CPU count)",
+    )
+    parser.add_argument(
+        "--cache",
+        action=BooleanOptionalAction,
+        help="also cache results on disk (default: $IBIS_CACHE)",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="enable verbose output"
+    )
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    if not args.socket and args.http is None:
+        parser.error("at least one of --socket or --http is required")
+
+    # The server (and everything it imports) is only needed in this mode.
+    from ibis.server import Analyzer, serve
+
+    workers = args.workers or os.cpu_count() or 1
+
+    analyzer = Analyzer(
+        AnalysisOptions(cache=default_cache(args.cache)), processes=workers
+    )
+    try:
+        serve(analyzer, args.socket, args.http, workers)
+    finally:
+        analyzer.close()
+
+    return 0
+
+
+def main() -> int:
+    # Serving is a separate mode with its own options; everything else treats
+    # arguments as inputs to analyze.
+    if sys.argv[1:2] == ["serve"]:
+        return _main_serve(sys.argv[2:])
+
+    parser = ArgumentParser(epilog="run `ibis serve --help` for server mode options")
     parser.add_argument(
-        "input", type=Path, help="input to analyze (iBoot family binary)"
+        "inputs",
+        metavar="input",
+        nargs="*",
+        help="input(s) to analyze (iBoot family binaries or IM4Ps, directories, globs, or archive members, e.g. `a.ipsw!Firmware/all_flash/iBoot*`)",
     )
     parser.add_argument("-j", "--json", action="store_true", help="emit output as JSON")
+    parser.add_argument(
+        "-f",
+        "--functions",
+        action="store_true",
+        help="include function start addresses (found by their prologues) in the output",
+    )
+    parser.add_argument(
+        "-n",
+        "--names",
+        action="store_true",
+        help="include the addresses of known functions identified by the strings they reference",
+    )
+    parser.add_argument(
+        "-s",
+        "--stats",
+        action="store_true",
+        help="report I/O statistics for each input (to stderr, unless emitting JSON)",
+    )
+    parser.add_argument(
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="number of worker processes to use for multiple inputs (default: 1)",
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="SECONDS",
+        type=float,
+        help="give up on an input if analysis takes longer than this",
+    )
+    parser.add_argument(
+        "--cache",
+        action=BooleanOptionalAction,
+        help="reuse cached results for previously analyzed inputs (default: $IBIS_CACHE)",
+    )
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="clear the result cache and exit"
+    )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="enable verbose output"
     )
@@ -42,30 +195,41 @@ def main():
     if args.verbose:
         logging.basicConfig(level=logging.DEBUG)
 
-    with args.input.open("rb") as f:
-        driver = BinaryIODriver(f)
+    if args.clear_cache:
+        LayoutCache.from_env().clear()
+        return 0
+    if not args.inputs:
+        parser.error("at least one input is required")
+
+    options = AnalysisOptions(
+        timeout=args.timeout,
+        cache=default_cache(args.cache),
+        functions=args.functions,
+        names=args.names,
+        stats=args.stats,
+    )
 
-        context = driver.detect_context()
-        layout = analyze(driver)
+    # Multiple inputs (or anything that expands to them) are analyzed in batch
+    # mode, where results are streamed out as JSON Lines (or text) records and
+    # failures are reported instead of aborting.
+    archive, member = split_archive_path(args.inputs[0])
+    if (
+        len(args.inputs) > 1
+        or not archive.is_file()
+        or (member is not None and is_glob(member))
+    ):
+        return _main_batch(args, options)
 
-        if args.json:
-            regions_json = {}
-            for name, region in layout.regions():
-                regions_json[name] = {
-                    "offset": region.file_offset,
-                    "size": region.size,
-                    "start": region.start,
-                    "end": region.end,
-                }
-
-            output_json = {
-                "app": str(context.app),
-                "version": str(context.version),
-                "target": context.target,
-                "regions": regions_json,
-            }
-
-            print(json.dumps(output_json))
-        else:
-            print(f"{context.app}/{context.version}/{context.target}\n")
-            _print_layout(layout)
+    with deadline(args.timeout), open_driver(Path(args.inputs[0])) as driver:
+        record = analyze_driver(driver, options)
+
+    if args.json:
+        print(json.dumps(record))
+    else:
+        _print_record(record, options)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -52,6 +52,29 @@ class App(Enum):
         return self.value
 
 
+# Banners start with the application name (see `App.parse`) and target, e.g.
+# "iBoot for n104, ...", so the prefix is enough to rule out other files.
+BANNER_PREFIXES = tuple(
+    f"{name} for ".encode()
+    for name in (
+        "SecureROM",
+        "iBoot",
+        "iBSS",
+        "iBEC",
+        "iBootStage1",
+        "iBootStage2",
+        "AVPBooter",
+    )
+)
+BANNER_MAGIC_SIZE = max(len(prefix) for prefix in BANNER_PREFIXES)
+
+
+def has_banner_magic(data: bytes | memoryview) -> bool:
+    """Check whether data (read from the banner offset) starts like a banner."""
+
+    return bytes(data[:BANNER_MAGIC_SIZE]).startswith(BANNER_PREFIXES)
+
+
 class TagParseError(Exception):
     pass
 
@@ -87,3 +110,17 @@ class Context:
 
         self.app = App.parse(app)
         self.version = Version(tag)
+
+    def to_dict(self) -> dict[str, str]:
+        return {
+            "app": str(self.app),
+            "version": str(self.version),
+            "target": self.target,
+        }
+
+    @classmethod
+    def from_dict(cls, obj: dict[str, str]) -> "Context":
+        # Reconstruct (enough of) the original banner and build tag.
+        return cls(
+            f"{obj['app']} for {obj['target']},", f"{obj['app']}-{obj['version']}"
+        )
@@ -1,9 +1,52 @@
 import logging
+import mmap
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import suppress
+from dataclasses import dataclass, field
 from os import SEEK_END
+from time import perf_counter
 from typing import BinaryIO
 
-from ibis.context import Context
+from ibis.context import BANNER_MAGIC_SIZE, Context, has_banner_magic
+from ibis.search import Haystack, PatternSet, compile_patterns
+
+# Reads within this many bytes of each other are coalesced by `read_many`.
+_COALESCE_GAP = 0x1000
+
+_HEADER_STR_SIZE = 0x40
+
+
+def _decode_str(data: bytes | memoryview) -> str:
+    return bytes(data).split(b"\x00")[0].decode().rstrip("\x00")
+
+
+def coalesce_ranges(
+    ranges: list[tuple[int, int]], gap: int = _COALESCE_GAP
+) -> list[tuple[int, int, list[int]]]:
+    """
+    Coalesce `(offset, size)` ranges which overlap or are within `gap` bytes of
+    each other into spans, returned as the start and end of each span along
+    with the indices of the ranges it covers.
+    """
+
+    spans = []
+
+    order = sorted(range(len(ranges)), key=lambda i: ranges[i][0])
+    while order:
+        # Grow a span from the lowest remaining range for as long as the next
+        # range starts close enough to the end of it.
+        start, end = ranges[order[0]][0], sum(ranges[order[0]])
+        count = 1
+        while count < len(order) and ranges[order[count]][0] <= end + gap:
+            end = max(end, sum(ranges[order[count]]))
+            count += 1
+
+        spans.append((start, end, order[:count]))
+        del order[:count]
+
+    return spans
 
 
 class Driver(ABC):
@@ -11,29 +54,119 @@ class Driver(ABC):
     _BUILD_TAG_OFFSET = 0x280
 
     @abstractmethod
-    def read(self, offset: int, size: int) -> bytes: ...
+    def read(self, offset: int, size: int) -> bytes | memoryview: ...
 
     @abstractmethod
     def size(self) -> int: ...
 
+    def read_into(self, offset: int, buffer: bytearray | memoryview) -> int:
+        """
+        Read up to `len(buffer)` bytes at `offset` into a preallocated buffer,
+        returning the number of bytes read.
+
+        Drivers should override this if they can fill the buffer without
+        allocating an intermediate copy.
+        """
+
+        data = self.read(offset, len(buffer))
+        memoryview(buffer)[: len(data)] = data
+
+        return len(data)
+
+    def read_many(
+        self, ranges: Iterable[tuple[int, int]], gap: int = _COALESCE_GAP
+    ) -> list[memoryview]:
+        """
+        Read several `(offset, size)` ranges at once, returning a view of the
+        data read for each, in the order requested.
+
+        Ranges which overlap or are within `gap` bytes of each other are
+        coalesced into a single underlying read, which saves round trips on
+        drivers where each read is expensive.
+        """
+
+        ranges = list(ranges)
+        views: list[memoryview] = [memoryview(b"")] * len(ranges)
+
+        for start, end, members in coalesce_ranges(ranges, gap):
+            data = memoryview(self.read(start, end - start))
+            for i in members:
+                offset, size = ranges[i]
+                views[i] = data[offset - start : offset - start + size]
+
+        return views
+
     def read_str(self, offset: int, size: int) -> str:
-        return self.read(offset, size).split(b"\x00")[0].decode().rstrip("\x00")
+        return _decode_str(self.read(offset, size))
+
+    @classmethod
+    def header_ranges(cls) -> list[tuple[int, int]]:
+        """Get the ranges of the banner and build tag, for `parse_context`."""
+
+        return [
+            (cls._BANNER_OFFSET, _HEADER_STR_SIZE),
+            (cls._BUILD_TAG_OFFSET, _HEADER_STR_SIZE),
+        ]
+
+    @staticmethod
+    def parse_context(banner: bytes | memoryview, tag: bytes | memoryview) -> Context:
+        """Get the context described by the data read from `header_ranges`."""
+
+        banner_str, tag_str = _decode_str(banner), _decode_str(tag)
+
+        logging.debug(f"Found banner: {banner_str}")
+        logging.debug(f"Found build tag: {tag_str}")
+
+        return Context(banner_str, tag_str)
 
     def detect_context(self) -> Context:
-        banner = self.read_str(self._BANNER_OFFSET, 0x40)
-        tag = self.read_str(self._BUILD_TAG_OFFSET, 0x40)
+        return self.parse_context(*self.read_many(self.header_ranges()))
 
-        logging.debug(f"Found banner: {banner}")
-        logging.debug(f"Found build tag: {tag}")
+    def has_magic(self) -> bool:
+        """
+        Cheaply check whether the image could be an iBoot family binary, from a
+        single small read of the start of the banner.
 
-        return Context(banner, tag)
+        Images passing this check may still fail `detect_context`, but those
+        failing it certainly will.
+        """
 
-    @staticmethod
-    def _find_first(data: bytes, needles: list[bytes]) -> int | None:
-        indices = [data.find(n) for n in needles]
-        indices = [i for i in indices if i >= 0]
+        return has_banner_magic(self.read(self._BANNER_OFFSET, BANNER_MAGIC_SIZE))
+
+    def window(self, offset: int, size: int) -> tuple[Haystack, int, int]:
+        """
+        Get a searchable window of (up to) `size` bytes at `offset`, returned as
+        a haystack alongside the `(lo, hi)` bounds of the window within it.
+
+        The haystack can be searched with `bytes.find` (which is all that
+        `ibis.search.PatternSet` needs), and may be larger than the window
+        (e.g. the whole mapped file, for drivers that can expose their data
+        without copying), so searches must be bounded by `lo` and `hi`. It is
+        only valid for as long as the driver is open.
+
+        Drivers should override this if they can provide a window without
+        copying; by default, the window is read into a new buffer.
+        """
+
+        data = self.read(offset, size)
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+
+        return data, 0, len(data)
+
+    def _find_in_chunk(
+        self, matcher: PatternSet, offset: int, chunk_size: int
+    ) -> int | None:
+        # Windows overlap with the following chunk so that matches straddling
+        # the chunk boundary are still found; only matches starting within the
+        # chunk itself are reported though.
+        haystack, lo, hi = self.window(offset, chunk_size + matcher.longest - 1)
+
+        match = matcher.search(haystack, lo, hi)
+        if match is None or match[0] - lo >= chunk_size:
+            return None
 
-        return min(indices) if indices else None
+        return offset + match[0] - lo
 
     def find_any(
         self,
@@ -43,40 +176,460 @@ class Driver(ABC):
         chunk_size: int,
         backwards: bool = False,
     ) -> int | None:
+        """
+        Find the first occurrence of any of the given patterns, scanning
+        `chunk_size` bytes at a time.
+
+        When searching backwards, the chunks are visited from the end of the
+        range towards the start, and the lowest match in the first chunk with
+        any match is returned.
+        """
+
         if start < 0:
             raise ValueError(f"invalid search start: {start}")
 
+        matcher = compile_patterns(tuple(patterns))
+
         end = min(end, self.size())
         cursor = end if backwards else start
 
         while True:
-            chunk = self.read(cursor, chunk_size)
-
-            if (chunk_offset := self._find_first(chunk, patterns)) is not None:
-                return cursor + chunk_offset
+            if (offset := self._find_in_chunk(matcher, cursor, chunk_size)) is not None:
+                return offset
 
             cursor += -chunk_size if backwards else chunk_size
 
-            if (backwards and cursor < start) or cursor >= end:
+            if backwards and cursor < start:
+                # Don't skip over whatever remains between the start of the
+                # range and the last chunk searched.
+                if cursor + chunk_size > start:
+                    return self._find_in_chunk(
+                        matcher, start, cursor + chunk_size - start
+                    )
+                break
+            if cursor >= end:
                 break
 
         return None
 
+    def finditer(
+        self,
+        patterns: list[bytes],
+        start: int,
+        end: int,
+        chunk_size: int = 0x10000,
+        backwards: bool = False,
+    ) -> Iterator[tuple[int, bytes]]:
+        """
+        Find every occurrence of any of the given patterns between `start` and
+        `end`, yielding each match's offset alongside the pattern that matched.
+
+        Matches are yielded in ascending order, or descending order if
+        searching backwards.
+        """
+
+        if start < 0:
+            raise ValueError(f"invalid search start: {start}")
+
+        matcher = compile_patterns(tuple(patterns))
+
+        end = min(end, self.size())
+        cursors = range(start, end, chunk_size)
+
+        for cursor in reversed(cursors) if backwards else cursors:
+            limit = min(cursor + chunk_size, end)
+            haystack, lo, hi = self.window(
+                cursor, min(limit + matcher.longest - 1, end) - cursor
+            )
+
+            # Only matches starting within the chunk itself count (see above).
+            stop = lo + limit - cursor
+
+            matches = []
+            for i, pattern in matcher.finditer(haystack, lo, hi):
+                if i >= stop:
+                    break
+                matches.append((cursor + i - lo, pattern))
+
+            yield from reversed(matches) if backwards else matches
+
 
 class BinaryIODriver(Driver):
     bio: BinaryIO
 
+    _size: int | None
+
     def __init__(self, bio: BinaryIO) -> None:
         super().__init__()
 
         self.bio = bio
+        self._size = None
 
     # @override
     def read(self, offset: int, size: int) -> bytes:
         self.bio.seek(offset)
         return self.bio.read(size)
 
+    # @override
+    def read_into(self, offset: int, buffer: bytearray | memoryview) -> int:
+        self.bio.seek(offset)
+        return self.bio.readinto(buffer)  # pyright: ignore[reportAttributeAccessIssue]
+
+    # @override
+    def size(self) -> int:
+        # The underlying file is not expected to change while it is being
+        # analyzed, so only seek to the end once.
+        if self._size is None:
+            self.bio.seek(0, SEEK_END)
+            self._size = self.bio.tell()
+
+        return self._size
+
+
+class BufferDriver(Driver):
+    """
+    Driver for data that is already in memory, e.g. `bytes`, `bytearray`, or
+    anything else supporting the buffer protocol.
+
+    Reads return `memoryview` slices of the underlying buffer rather than
+    copies; convert them with `bytes()` if they need to outlive the buffer.
+    """
+
+    view: memoryview
+
+    _haystack: Haystack | None
+
+    def __init__(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> None:
+        super().__init__()
+
+        self.view = memoryview(buffer).cast("B")
+
+        # Searches can run directly against the underlying object (rather than
+        # a copy of each window) if it supports it.
+        self._haystack = (
+            buffer if isinstance(buffer, (bytes, bytearray, mmap.mmap)) else None
+        )
+
+    # @override
+    def read(self, offset: int, size: int) -> memoryview:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        return self.view[offset : offset + size]
+
+    # @override
+    def window(self, offset: int, size: int) -> tuple[Haystack, int, int]:
+        if self._haystack is None:
+            return super().window(offset, size)
+
+        return (
+            self._haystack,
+            min(offset, len(self.view)),
+            min(offset + size, len(self.view)),
+        )
+
     # @override
     def size(self) -> int:
-        self.bio.seek(0, SEEK_END)
-        return self.bio.tell()
+        return len(self.view)
+
+
+class MmapDriver(BufferDriver):
+    """
+    Driver backed by a read-only memory mapping of a file.
+
+    Views returned by `read` reference the mapping directly; if any are still
+    alive when the driver is closed, the mapping is left for the garbage
+    collector to release once they are gone.
+    """
+
+    _map: mmap.mmap
+
+    def __init__(self, f: BinaryIO) -> None:
+        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        super().__init__(self._map)
+
+    def close(self):
+        self.view.release()
+
+        with suppress(BufferError):
+            self._map.close()
+
+    def __enter__(self) -> "MmapDriver":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+@dataclass
+class ReadEvent:
+    offset: int
+    size: int
+    latency: float
+
+
+@dataclass
+class SearchEvent:
+    patterns: list[bytes]
+    start: int
+    end: int
+    backwards: bool
+
+    chunks: int = 0
+    bytes_read: int = 0
+    hit: int | None = None
+
+
+@dataclass
+class DriverStats:
+    """I/O statistics recorded by an `InstrumentedDriver`."""
+
+    reads: list[ReadEvent] = field(default_factory=list)
+    searches: list[SearchEvent] = field(default_factory=list)
+    size_calls: int = 0
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(r.size for r in self.reads)
+
+    @property
+    def read_time(self) -> float:
+        return sum(r.latency for r in self.reads)
+
+    def to_dict(self) -> dict:
+        return {
+            "reads": len(self.reads),
+            "bytes_read": self.bytes_read,
+            "read_time": self.read_time,
+            "size_calls": self.size_calls,
+            "searches": [
+                {
+                    "patterns": [p.decode(errors="replace") for p in s.patterns],
+                    "start": s.start,
+                    "end": s.end,
+                    "backwards": s.backwards,
+                    "chunks": s.chunks,
+                    "bytes_read": s.bytes_read,
+                    "hit": s.hit,
+                }
+                for s in self.searches
+            ],
+        }
+
+    def summary(self) -> str:
+        return self.format_dict(self.to_dict())
+
+    @staticmethod
+    def format_dict(obj: dict) -> str:
+        """Format statistics (see `to_dict`) as a human-readable summary."""
+
+        lines = [
+            f"Reads:       {obj['reads']} ({obj['bytes_read']:#x} bytes, {obj['read_time'] * 1000:.3f} ms)",
+            f"Size calls:  {obj['size_calls']}",
+            f"Searches:    {len(obj['searches'])}",
+        ]
+
+        for s in obj["searches"]:
+            patterns = ", ".join(repr(p) for p in s["patterns"])
+            hit = f"{s['hit']:#x}" if s["hit"] is not None else "none"
+            direction = "backwards" if s["backwards"] else "forwards"
+
+            lines.append(
+                f"  [{patterns}] in {s['start']:#x}-{s['end']:#x} ({direction}): "
+                f"{s['chunks']} chunks, {s['bytes_read']:#x} bytes, hit {hit}"
+            )
+
+        return "\n".join(lines)
+
+
+class InstrumentedDriver(Driver):
+    """
+    Driver wrapper that records every read, size query, and search made
+    through it, to help figure out where analysis spends its I/O.
+    """
+
+    driver: Driver
+
+    _stats: DriverStats
+    _search: SearchEvent | None
+
+    def __init__(self, driver: Driver) -> None:
+        super().__init__()
+
+        self.driver = driver
+
+        self._stats = DriverStats()
+        self._search = None
+
+    def stats(self) -> DriverStats:
+        return self._stats
+
+    def _record_read(self, offset: int, size: int, start: float):
+        self._stats.reads.append(ReadEvent(offset, size, perf_counter() - start))
+
+        if self._search:
+            self._search.chunks += 1
+            self._search.bytes_read += size
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        start = perf_counter()
+        data = self.driver.read(offset, size)
+        self._record_read(offset, len(data), start)
+
+        return data
+
+    # @override
+    def read_into(self, offset: int, buffer: bytearray | memoryview) -> int:
+        start = perf_counter()
+        size = self.driver.read_into(offset, buffer)
+        self._record_read(offset, size, start)
+
+        return size
+
+    # @override
+    def size(self) -> int:
+        self._stats.size_calls += 1
+        return self.driver.size()
+
+    # @override
+    def find_any(
+        self,
+        patterns: list[bytes],
+        start: int,
+        end: int,
+        chunk_size: int,
+        backwards: bool = False,
+    ) -> int | None:
+        self._search = SearchEvent(list(patterns), start, end, backwards)
+        self._stats.searches.append(self._search)
+
+        try:
+            self._search.hit = super().find_any(
+                patterns, start, end, chunk_size, backwards
+            )
+            return self._search.hit
+        finally:
+            self._search = None
+
+
+class CachedDriver(Driver):
+    """
+    Driver wrapper that serves reads from an LRU cache of aligned blocks, for
+    use with drivers where each read is expensive.
+
+    Reads that continue a sequential scan (in either direction) also fetch the
+    next few blocks in the direction of the scan ahead of time, in the same
+    underlying read as the blocks actually requested.
+    """
+
+    driver: Driver
+    block_size: int
+    capacity: int
+    readahead: int
+
+    _blocks: OrderedDict[int, bytes]
+    _size: int | None
+    _last: tuple[int, int, int] | None
+
+    def __init__(
+        self,
+        driver: Driver,
+        block_size: int = 0x4000,
+        capacity: int = 256,
+        readahead: int = 4,
+    ) -> None:
+        super().__init__()
+
+        self.driver = driver
+        self.block_size = block_size
+        self.capacity = capacity
+        self.readahead = readahead
+
+        self._blocks = OrderedDict()
+        self._size = None
+        self._last = None
+
+    # @override
+    def size(self) -> int:
+        if self._size is None:
+            self._size = self.driver.size()
+
+        return self._size
+
+    def _fetch(self, first: int, last: int):
+        """Read and cache blocks `first` through `last` (inclusive)."""
+
+        data = self.driver.read(
+            first * self.block_size, (last - first + 1) * self.block_size
+        )
+
+        for i in range(last - first + 1):
+            block = bytes(data[i * self.block_size : (i + 1) * self.block_size])
+
+            self._blocks[first + i] = block
+            self._blocks.move_to_end(first + i)
+
+        while len(self._blocks) > self.capacity:
+            self._blocks.popitem(last=False)
+
+    def _block(self, index: int) -> bytes:
+        block = self._blocks[index]
+        self._blocks.move_to_end(index)
+
+        return block
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        size = max(0, min(size, self.size() - offset))
+        if size == 0:
+            return b""
+
+        first = offset // self.block_size
+        last = (offset + size - 1) // self.block_size
+
+        # Reads too large to cache would just evict everything else.
+        if last - first + 1 > self.capacity // 2:
+            return self.driver.read(offset, size)
+
+        missing = [i for i in range(first, last + 1) if i not in self._blocks]
+        if missing:
+            fetch_first, fetch_last = missing[0], missing[-1]
+
+            # Never read ahead more than fits alongside the requested blocks,
+            # or fetching would evict the very blocks being read.
+            readahead = min(self.readahead, self.capacity - (last - first + 1))
+
+            # Reads continuing on from (or overlapping with) the last one are
+            # considered part of a sequential scan.
+            if self._last:
+                last_offset, last_first, last_last = self._last
+
+                if last_offset < offset and first <= last_last + 1:
+                    fetch_last += readahead
+                elif offset < last_offset and last >= last_first - 1:
+                    fetch_first = max(0, fetch_first - readahead)
+
+            # Requested blocks which are already cached must survive the
+            # eviction that follows the fetch too.
+            for i in range(first, last + 1):
+                if i in self._blocks:
+                    self._blocks.move_to_end(i)
+
+            # Don't bother reading past the end of the underlying data.
+            fetch_last = min(fetch_last, (self.size() - 1) // self.block_size)
+
+            self._fetch(fetch_first, fetch_last)
+
+        self._last = (offset, first, last)
+
+        start = offset - first * self.block_size
+        if first == last:
+            return memoryview(self._block(first))[start : start + size]
+
+        data = b"".join(self._block(i) for i in range(first, last + 1))
+        return data[start : start + size]
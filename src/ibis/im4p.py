@@ -0,0 +1,299 @@
+import struct
+from typing import NamedTuple
+
+from ibis.driver import Driver
+from ibis.search import Haystack
+
+try:
+    import liblzfse  # pyright: ignore[reportMissingImports]
+except ImportError:
+    liblzfse = None
+
+
+class Im4pError(Exception):
+    pass
+
+
+_DER_OCTET_STRING = 0x04
+_DER_IA5_STRING = 0x16
+_DER_SEQUENCE = 0x30
+
+_LZSS_MAGIC = b"complzss"
+_LZSS_HEADER = struct.Struct(">8sIII")
+_LZSS_HEADER_SIZE = 0x180
+_LZSS_RING_SIZE = 0x1000
+_LZSS_MAX_MATCH = 18
+_LZSS_THRESHOLD = 2
+_LZSS_RING_START = _LZSS_RING_SIZE - _LZSS_MAX_MATCH
+
+_LZFSE_MAGIC = b"bvx"
+
+# Compressed payloads are decoded ahead of the requested offset in steps of
+# (at least) this many bytes, rather than exactly as far as each read needs.
+_INFLATE_STEP = 0x10000
+
+
+class _Element(NamedTuple):
+    """A DER element's tag and the location of its contents."""
+
+    tag: int
+    offset: int
+    length: int
+
+
+def is_im4p(driver: Driver) -> bool:
+    """Check whether the image behind a driver looks like an IM4P or IMG4."""
+
+    header = bytes(driver.read(0, 0x10))
+    if not header.startswith(b"\x30"):
+        return False
+
+    return b"\x16\x04IM4P" in header or b"\x16\x04IMG4" in header
+
+
+class Im4pDriver(Driver):
+    """
+    Driver exposing the payload of an IM4P (optionally wrapped in an IMG4)
+    read through another driver.
+
+    Raw payloads are read straight from the underlying driver. LZSS payloads
+    are decompressed incrementally, only as far as has been read so far, and
+    kept in memory. LZFSE payloads require the optional `pyliblzfse` package
+    and are decompressed in full on first read.
+
+    Encrypted payloads are not supported.
+    """
+
+    source: Driver
+
+    type: str
+    """Four-character type of the payload, e.g. `ibot`."""
+
+    description: str
+    """Description of the payload, e.g. `iBoot-11881.1.1`."""
+
+    compression: str | None
+    """Compression of the payload (`lzss` or `lzfse`), if any."""
+
+    _payload: _Element
+    _size: int
+
+    _compressed: bytes | None
+    _buffer: bytearray | None
+
+    # Progress of incremental (LZSS) decompression.
+    _decoded: int
+    _cursor: int
+    _flags: int
+
+    def __init__(self, source: Driver) -> None:
+        super().__init__()
+
+        self.source = source
+
+        self._compressed = None
+        self._buffer = None
+        self._decoded = self._cursor = self._flags = 0
+
+        self._parse(self._read_element(0))
+        self._detect_compression()
+
+    def _read_element(self, offset: int) -> _Element:
+        header = bytes(self.source.read(offset, 6))
+        if len(header) < 2:
+            raise Im4pError(f"truncated DER element at {offset:#x}")
+
+        tag, length = header[0], header[1]
+        if length < 0x80:
+            return _Element(tag, offset + 2, length)
+
+        count = length & 0x7F
+        if not 0 < count <= 4 or len(header) < 2 + count:
+            raise Im4pError(f"unsupported DER length at {offset:#x}")
+
+        length = int.from_bytes(header[2 : 2 + count], "big")
+        return _Element(tag, offset + 2 + count, length)
+
+    def _read_children(self, parent: _Element) -> list[_Element]:
+        children = []
+
+        cursor, end = parent.offset, parent.offset + parent.length
+        while cursor < end:
+            child = self._read_element(cursor)
+            children.append(child)
+            cursor = child.offset + child.length
+
+        return children
+
+    def _read_contents(self, element: _Element, tag: int) -> bytes:
+        if element.tag != tag:
+            raise Im4pError(
+                f"unexpected DER tag at {element.offset:#x}: "
+                f"{element.tag:#x} (expected {tag:#x})"
+            )
+
+        return bytes(self.source.read(element.offset, element.length))
+
+    def _parse(self, root: _Element):
+        if root.tag != _DER_SEQUENCE:
+            raise Im4pError("not an IM4P: expected a DER sequence")
+
+        children = self._read_children(root)
+        magic = self._read_contents(children[0], _DER_IA5_STRING) if children else b""
+
+        # An IMG4 wraps the IM4P (as its first element), followed by the
+        # manifest and restore info, neither of which are relevant here.
+        if magic == b"IMG4" and len(children) > 1:
+            return self._parse(children[1])
+        if magic != b"IM4P" or len(children) < 4:
+            raise Im4pError(f"not an IM4P: unexpected magic {magic!r}")
+
+        self.type = self._read_contents(children[1], _DER_IA5_STRING).decode()
+        self.description = self._read_contents(children[2], _DER_IA5_STRING).decode()
+
+        self._payload = children[3]
+        if self._payload.tag != _DER_OCTET_STRING:
+            raise Im4pError("not an IM4P: missing payload")
+
+        # Keybags for encrypted payloads are the only other octet string that
+        # may follow the payload.
+        if any(child.tag == _DER_OCTET_STRING for child in children[4:]):
+            raise Im4pError(f"payload ({self.type}) is encrypted")
+
+    def _detect_compression(self):
+        magic = bytes(self.source.read(self._payload.offset, len(_LZSS_MAGIC)))
+
+        if magic == _LZSS_MAGIC:
+            header = bytes(self.source.read(self._payload.offset, _LZSS_HEADER.size))
+            if len(header) < _LZSS_HEADER.size:
+                raise Im4pError("truncated LZSS header")
+
+            _, _, size, compressed_size = _LZSS_HEADER.unpack(header)
+
+            self.compression = "lzss"
+            self._size = size
+            self._compressed = bytes(
+                self.source.read(
+                    self._payload.offset + _LZSS_HEADER_SIZE,
+                    min(compressed_size, self._payload.length - _LZSS_HEADER_SIZE),
+                )
+            )
+            self._buffer = bytearray(size)
+        elif magic.startswith(_LZFSE_MAGIC):
+            self.compression = "lzfse"
+            self._size = 0
+        else:
+            self.compression = None
+            self._size = self._payload.length
+
+    def _inflate(self, until: int):
+        """Decode LZSS-compressed data until (at least) `until` bytes are ready."""
+
+        assert self._buffer is not None and self._compressed is not None
+
+        out, src = self._buffer, self._compressed
+        total, limit = len(out), len(src)
+        until = min(max(until, self._decoded + _INFLATE_STEP), total)
+
+        i, p, flags = self._decoded, self._cursor, self._flags
+        while i < until and p < limit:
+            # Each flag byte describes the following eight items, with the
+            # high byte tracking how many of them remain.
+            flags >>= 1
+            if not flags & 0x100:
+                flags = src[p] | 0xFF00
+                p += 1
+                if p >= limit:
+                    break
+
+            if flags & 1:
+                out[i] = src[p]
+                i += 1
+                p += 1
+                continue
+
+            if p + 1 >= limit:
+                p = limit
+                break
+
+            lo, hi = src[p], src[p + 1]
+            p += 2
+
+            # References are to a position in the ring buffer, which holds the
+            # last 4 KiB of output, starting just before the end.
+            position = lo | (hi & 0xF0) << 4
+            length = min((hi & 0x0F) + _LZSS_THRESHOLD + 1, total - i)
+            distance = (i + _LZSS_RING_START - position) % _LZSS_RING_SIZE
+            j = i - (distance or _LZSS_RING_SIZE)
+
+            if j >= 0 and i - j >= length:
+                out[i : i + length] = out[j : j + length]
+            else:
+                # Overlapping copies repeat output as it is being written;
+                # references before the start of the output see the initial
+                # contents of the ring buffer. Output starts at the ring's
+                # write position, so the last `_LZSS_RING_START` bytes before
+                # it are spaces, and anything further back is zeros.
+                for k in range(length):
+                    if j + k >= 0:
+                        out[i + k] = out[j + k]
+                    elif j + k >= -_LZSS_RING_START:
+                        out[i + k] = 0x20
+
+            i += length
+
+        # The output is truncated if the compressed data runs out early.
+        if p >= limit:
+            self._size = i
+
+        self._decoded, self._cursor, self._flags = i, p, flags
+
+    def _decompress_lzfse(self):
+        if liblzfse is None:
+            raise Im4pError(
+                "payload is LZFSE-compressed; install `pyliblzfse` to support it"
+            )
+
+        data = liblzfse.decompress(
+            bytes(self.source.read(self._payload.offset, self._payload.length))
+        )
+
+        self._buffer = bytearray(data)
+        self._decoded = self._size = len(data)
+
+    def _ensure(self, end: int) -> bytearray | None:
+        """Ensure the payload is available up to `end` if it is compressed."""
+
+        if self.compression == "lzfse" and self._buffer is None:
+            self._decompress_lzfse()
+        elif self.compression == "lzss" and min(end, self._size) > self._decoded:
+            self._inflate(end)
+
+        return self._buffer
+
+    # @override
+    def read(self, offset: int, size: int) -> bytes | memoryview:
+        if offset < 0:
+            raise ValueError(f"invalid read offset: {offset}")
+
+        buffer = self._ensure(offset + size)
+        if buffer is None:
+            size = max(min(size, self._payload.length - offset), 0)
+            return self.source.read(self._payload.offset + offset, size)
+
+        return memoryview(buffer)[offset : min(offset + size, self._size)]
+
+    # @override
+    def window(self, offset: int, size: int) -> tuple[Haystack, int, int]:
+        buffer = self._ensure(offset + size)
+        if buffer is None:
+            return super().window(offset, size)
+
+        return buffer, min(offset, self._size), min(offset + size, self._size)
+
+    # @override
+    def size(self) -> int:
+        if self.compression == "lzfse":
+            self._ensure(0)
+
+        return self._size
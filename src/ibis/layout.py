@@ -11,7 +11,7 @@ class MalformedLayoutError(Exception):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Region:
     """Bounded memory region."""
 
@@ -29,6 +29,18 @@ class Region:
         """Tells if this region is well-formed."""
         return self.end > self.start and self.size > 0
 
+    def to_dict(self) -> dict[str, int | None]:
+        return {
+            "offset": self.file_offset,
+            "size": self.size,
+            "start": self.start,
+            "end": self.end,
+        }
+
+    @classmethod
+    def from_dict(cls, obj: dict[str, int | None]) -> "Region":
+        return cls(obj["start"], obj["end"], obj["offset"])  # pyright: ignore[reportArgumentType]
+
     def __gt__(self, rhs: "Region") -> bool:
         return self.start > rhs.end
 
@@ -44,7 +56,7 @@ class Region:
         return f"{prefix}({self.start:#x}, {self.end:#x})"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Layout:
     """
     iBoot/SecureROM memory regions.
@@ -60,9 +72,19 @@ class Layout:
 
     def regions(self) -> Generator[tuple[str, Region]]:
         for f in fields(self):
-            if region := getattr(self, f.name):
+            if isinstance(region := getattr(self, f.name), Region):
                 yield (f.name.upper(), region)
 
+    def to_dict(self) -> dict[str, dict[str, int | None]]:
+        return {name: region.to_dict() for name, region in self.regions()}
+
+    @classmethod
+    def from_dict(cls, obj: dict[str, dict[str, int | None]]) -> "Layout":
+        def region(name: str) -> Region | None:
+            return Region.from_dict(obj[name]) if name in obj else None
+
+        return cls(region("TEXT"), region("CONST"), region("DATA"), region("BSS"))  # pyright: ignore[reportArgumentType]
+
     def validate(self):
         logging.debug("Checking region order and bounds...")
 
@@ -0,0 +1,170 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+
+from ibis.driver import Driver
+from ibis.layout import Layout
+
+# Zero-filled reads up to this size are served as views of a shared buffer.
+_ZEROS = bytes(0x4000)
+
+
+class UnmappedAddressError(Exception):
+    pass
+
+
+class MemoryImage:
+    """
+    Virtual address space of an image, as described by its layout, for
+    reading and translating addresses without redoing the region arithmetic.
+
+    Each region is backed by the file from its offset for as much of it as the
+    file covers; the rest of the region (and all of BSS) reads as zeros.
+    """
+
+    driver: Driver
+    layout: Layout
+
+    # Parallel lists, one entry per region, ordered by start address.
+    _starts: list[int]
+    _ends: list[int]
+    _offsets: list[int | None]
+    _backed: list[int]
+    """Number of bytes at the start of each region backed by the file."""
+
+    # File-backed regions only, ordered by file offset, as (offset, index).
+    _by_offset: list[tuple[int, int]]
+
+    def __init__(self, driver: Driver, layout: Layout) -> None:
+        self.driver = driver
+        self.layout = layout
+
+        file_size = driver.size()
+        regions = sorted((r for _, r in layout.regions()), key=lambda r: r.start)
+
+        self._starts = [r.start for r in regions]
+        self._ends = [r.end for r in regions]
+        self._offsets = [r.file_offset for r in regions]
+        self._backed = [
+            0
+            if r.file_offset is None
+            else max(0, min(r.size, file_size - r.file_offset))
+            for r in regions
+        ]
+
+        self._by_offset = sorted(
+            (offset, i)
+            for i, offset in enumerate(self._offsets)
+            if offset is not None and self._backed[i]
+        )
+
+    def _region(self, addr: int) -> int | None:
+        i = bisect_right(self._starts, addr) - 1
+        if i < 0 or addr >= self._ends[i]:
+            return None
+
+        return i
+
+    def is_mapped(self, addr: int) -> bool:
+        return self._region(addr) is not None
+
+    def va_to_offset(self, addr: int) -> int | None:
+        """
+        Get the file offset backing an address, or `None` if it isn't backed
+        by the file (i.e. it is unmapped, or reads as zeros).
+        """
+
+        i = self._region(addr)
+        if i is None:
+            return None
+
+        delta = addr - self._starts[i]
+        if delta >= self._backed[i]:
+            return None
+
+        return self._offsets[i] + delta  # pyright: ignore[reportOptionalOperand]
+
+    def offset_to_va(self, offset: int) -> int | None:
+        """Get the address a file offset is mapped at, if it is mapped."""
+
+        j = bisect_right(self._by_offset, (offset, len(self._starts))) - 1
+        if j < 0:
+            return None
+
+        start, i = self._by_offset[j]
+        if offset - start >= self._backed[i]:
+            return None
+
+        return self._starts[i] + offset - start
+
+    def va_to_offsets(self, addrs: Iterable[int]) -> array:
+        """
+        Translate many addresses to file offsets at once (see `va_to_offset`),
+        returned as an array (`array('q')`) with -1 for those not backed by
+        the file.
+        """
+
+        starts, ends, offsets, backed = (
+            self._starts,
+            self._ends,
+            self._offsets,
+            self._backed,
+        )
+
+        result = array("q")
+        append = result.append
+        for addr in addrs:
+            i = bisect_right(starts, addr) - 1
+            if i < 0 or addr >= ends[i] or addr - starts[i] >= backed[i]:
+                append(-1)
+            else:
+                append(offsets[i] + addr - starts[i])  # pyright: ignore[reportOptionalOperand]
+
+        return result
+
+    def offsets_to_va(self, offsets: Iterable[int]) -> array:
+        """
+        Translate many file offsets to addresses at once (see `offset_to_va`),
+        returned as an array (`array('q')`) with -1 for those not mapped.
+        """
+
+        result = array("q")
+        for offset in offsets:
+            addr = self.offset_to_va(offset)
+            result.append(-1 if addr is None else addr)
+
+        return result
+
+    def read_va(self, addr: int, size: int) -> memoryview:
+        """
+        Read `size` bytes at an address, which may span adjacent regions.
+
+        Reads within the file-backed part of a single region are views of the
+        driver's data, without copying where the driver supports it.
+        """
+
+        pieces = []
+        while size > 0:
+            i = self._region(addr)
+            if i is None:
+                raise UnmappedAddressError(f"{addr:#x} is not mapped")
+
+            delta = addr - self._starts[i]
+            count = min(size, self._ends[i] - addr)
+
+            if delta < self._backed[i]:
+                count = min(count, self._backed[i] - delta)
+                offset = self._offsets[i] + delta  # pyright: ignore[reportOptionalOperand]
+                pieces.append(memoryview(self.driver.read(offset, count)))
+            elif count <= len(_ZEROS):
+                pieces.append(memoryview(_ZEROS)[:count])
+            else:
+                pieces.append(memoryview(bytes(count)))
+
+            addr += count
+            size -= count
+
+        if len(pieces) == 1:
+            return pieces[0]
+
+        return memoryview(b"".join(pieces))
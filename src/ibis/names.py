@@ -0,0 +1,152 @@
+import logging
+import struct
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Literal, NamedTuple
+
+from ibis.driver import Driver
+from ibis.layout import Layout
+from ibis.scan import find_starts
+from ibis.signatures import Signature, compile_signatures
+from ibis.strings import StringIndex
+
+_ADRP = Signature("adrp", ((0x9F000000, 0x90000000),), 0)
+
+# Instructions after each ADRP searched for an ADD of its page offset, since
+# compilers often schedule other instructions between the two.
+_ADRP_WINDOW = 4
+
+_ADD_MASK, _ADD = 0xFFC00000, 0x91000000  # add xD, xN, #imm
+
+# Control flow ends the search for an ADRP's ADD: b, bl, and br, blr, ret.
+_BRANCHES = ((0x7C000000, 0x14000000), (0xFE000000, 0xD6000000))
+
+_WORD = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class NameRule:
+    """Rule naming the function which references a particular string."""
+
+    name: str
+    string: bytes
+    match: Literal["exact", "prefix", "substring"] = "exact"
+
+
+RULES = (NameRule("panic", b"double panic in", "prefix"),)
+"""Rules for identifying known functions common to iBoot family images."""
+
+
+class StringRefs(NamedTuple):
+    """References to strings from TEXT, in ascending order of address."""
+
+    addresses: array
+    """Address of each referencing instruction (`array('Q')`)."""
+
+    strings: array
+    """Index (see `StringIndex`) of each referenced string (`array('I')`)."""
+
+
+def find_string_refs(driver: Driver, layout: Layout) -> StringRefs:
+    """
+    Find every ADRP (and ADD of a page offset) in TEXT computing the address of
+    a string in CONST, in a single (linear) pass over TEXT.
+
+    Each ADD is looked for within a few instructions of its ADRP, until the
+    ADRP's register is (likely) overwritten or control flow leaves the block.
+    References are reported at the address of the ADRP.
+    """
+
+    addresses, strings = array("Q"), array("I")
+
+    text = layout.text
+    if text.file_offset is None:
+        return StringRefs(addresses, strings)
+
+    index = StringIndex.for_driver(driver, layout.const)
+    const = layout.const
+
+    pattern, _ = compile_signatures((_ADRP,))
+    haystack, lo, hi = driver.window(text.file_offset, text.size)
+
+    for match in pattern.finditer(haystack, lo, hi):
+        i = match.start()
+        if (i - lo) % 4:
+            continue
+
+        (adrp,) = _WORD.unpack_from(haystack, i)
+        register = adrp & 0x1F
+
+        immediate = ((adrp >> 5) & 0x7FFFF) << 2 | (adrp >> 29) & 0x3
+        if immediate & (1 << 20):
+            immediate -= 1 << 21
+
+        pc = text.start + i - lo
+        page = (pc & ~0xFFF) + (immediate << 12)
+
+        end = min(i + 4 * (_ADRP_WINDOW + 1), hi - (hi - i) % 4)
+        for (word,) in _WORD.iter_unpack(haystack[i + 4 : end]):
+            if word & _ADD_MASK == _ADD and (word >> 5) & 0x1F == register:
+                target = page + ((word >> 10) & 0xFFF)
+                if const.start <= target < const.end:
+                    string = index.at(target)
+                    if string is not None:
+                        addresses.append(pc)
+                        strings.append(string)
+
+            # Anything else with the register as its destination is assumed
+            # to overwrite it (stores of it are rare this soon after).
+            if word & 0x1F == register or any(word & m == v for m, v in _BRANCHES):
+                break
+
+    return StringRefs(addresses, strings)
+
+
+def identify_functions(
+    driver: Driver,
+    layout: Layout,
+    rules: tuple[NameRule, ...] = RULES,
+    starts: array | None = None,
+) -> dict[str, int]:
+    """
+    Identify known functions by the strings they reference (see `RULES`),
+    returning the address of each function identified, by name.
+
+    Each string reference is attributed to the closest function start before
+    it; if function starts aren't given, they are found by their prologues
+    (see `ibis.scan.find_starts`). Rules which would name more than one
+    function (or none) are skipped.
+    """
+
+    index = StringIndex.for_driver(driver, layout.const)
+    refs = find_string_refs(driver, layout)
+    if starts is None:
+        starts = find_starts(driver, layout)
+
+    matches = {rule: getattr(index, rule.match)(rule.string) for rule in rules}
+    wanted = {string for strings in matches.values() for string in strings}
+
+    # Functions referencing each string, only for strings the rules care about.
+    referrers: dict[int, set[int]] = {}
+    for addr, string in zip(refs.addresses, refs.strings, strict=True):
+        if string not in wanted:
+            continue
+
+        i = bisect_right(starts, addr) - 1
+        if i >= 0:
+            referrers.setdefault(string, set()).add(starts[i])
+
+    names = {}
+    for rule in rules:
+        functions = set()
+        for string in matches[rule]:
+            functions |= referrers.get(string, set())
+
+        if len(functions) != 1:
+            logging.debug(f"Can't identify {rule.name}: {len(functions)} candidate(s)")
+            continue
+
+        names[rule.name] = functions.pop()
+
+    return names
@@ -0,0 +1,151 @@
+import struct
+import zlib
+from array import array
+from collections import Counter
+from typing import NamedTuple
+
+from ibis.driver import Driver
+from ibis.layout import Layout
+from ibis.search import Haystack
+from ibis.signatures import SIGNATURES, Signature, compile_signatures
+
+_BL = Signature("bl", ((0xFC000000, 0x94000000),), 0)
+
+# Instructions ending an outlined function: a return, or a tail call.
+_ENDS = (
+    (0xFFFFFFFF, 0xD65F03C0),  # ret
+    (0xFFFFFFFF, 0xD65F0BFF),  # retaa
+    (0xFFFFFFFF, 0xD65F0FFF),  # retab
+    (0xFC000000, 0x14000000),  # b
+)
+
+# Outlined functions never set up a frame, so anything starting with a
+# (single instruction) prologue is an ordinary function.
+_PROLOGUES = tuple(s.words[0] for s in SIGNATURES if len(s.words) == 1)
+
+
+class OutlinedFunctions(NamedTuple):
+    """Outlined functions found in TEXT, in ascending order of address."""
+
+    addresses: array
+    """Address of each function (`array('Q')`)."""
+
+    sizes: array
+    """Size of each function in bytes (`array('H')`)."""
+
+    callers: array
+    """Number of calls to each function (`array('I')`)."""
+
+    hashes: array
+    """CRC-32 of each function's instructions (`array('I')`)."""
+
+    copies: array
+    """Number of functions in TEXT with the same instructions (`array('I')`)."""
+
+
+def _call_targets(haystack: Haystack, lo: int, hi: int, base: int) -> Counter:
+    """Count the calls to each BL target in a window of code at `base`."""
+
+    pattern, _ = compile_signatures((_BL,))
+
+    targets = array("Q")
+    for match in pattern.finditer(haystack, lo, hi):
+        i = match.start()
+        if (i - lo) % 4:
+            continue
+
+        (word,) = struct.unpack_from("<I", haystack, i)
+        offset = word & 0x3FFFFFF
+        if offset & (1 << 25):
+            offset -= 1 << 26
+
+        targets.append(base + i - lo + offset * 4)
+
+    return Counter(targets)
+
+
+def find_outlined(
+    driver: Driver,
+    layout: Layout,
+    min_callers: int = 2,
+    max_length: int = 16,
+    min_copies: int = 1,
+) -> OutlinedFunctions:
+    """
+    Find functions created by the compiler's machine outliner, i.e. the
+    `OUTLINED_FUNCTION_N` helpers, in a single pass over TEXT.
+
+    Every BL target in TEXT which doesn't start with a prologue and ends with
+    a return or tail call within `max_length` instructions is hashed. As the
+    outliner runs separately for each module, the same helper is often
+    emitted several times, so candidates are grouped by hash: a group is
+    flagged if it has at least `min_copies` members, called at least
+    `min_callers` times in total. Each function's hash can also be used to
+    match up identical helpers across images.
+
+    Small leaf functions (which don't need a frame either) look just the same,
+    unless they are required to be duplicated (with `min_copies` of 2 or
+    more), so results are only candidates, and shouldn't be named as outlined.
+    """
+
+    result = OutlinedFunctions(
+        array("Q"), array("H"), array("I"), array("I"), array("I")
+    )
+
+    text = layout.text
+    if text.file_offset is None:
+        return result
+
+    haystack, lo, hi = driver.window(text.file_offset, text.size)
+
+    # Candidates, as parallel arrays, and the number of copies and total calls
+    # of each distinct body.
+    addresses, sizes, callers, hashes = array("Q"), array("H"), array("I"), array("I")
+    copies: Counter = Counter()
+    calls: Counter = Counter()
+
+    for target, count in sorted(_call_targets(haystack, lo, hi, text.start).items()):
+        if not text.start <= target < text.end:
+            continue
+
+        # TEXT may extend past the end of the file.
+        start = lo + target - text.start
+        length = max(0, min(max_length, (hi - start) // 4))
+        if not length:
+            continue
+
+        words = struct.unpack_from(f"<{length}I", haystack, start)
+        if any(words[0] & m == v for m, v in _PROLOGUES):
+            continue
+
+        length = next(
+            (
+                n + 1
+                for n, word in enumerate(words)
+                if any(word & m == v for m, v in _ENDS)
+            ),
+            None,
+        )
+        if length is None:
+            continue
+
+        digest = zlib.crc32(haystack[start : start + length * 4])
+        copies[digest] += 1
+        calls[digest] += count
+
+        addresses.append(target)
+        sizes.append(length * 4)
+        callers.append(count)
+        hashes.append(digest)
+
+    for i, digest in enumerate(hashes):
+        if copies[digest] < min_copies or calls[digest] < min_callers:
+            continue
+
+        result.addresses.append(addresses[i])
+        result.sizes.append(sizes[i])
+        result.callers.append(callers[i])
+        result.hashes.append(digest)
+        result.copies.append(copies[digest])
+
+    return result
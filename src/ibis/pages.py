@@ -0,0 +1,133 @@
+from collections.abc import Iterator
+from enum import IntEnum
+
+from ibis.driver import Driver
+
+
+class PageKind(IntEnum):
+    """Classification of a page's contents."""
+
+    ZERO = 0
+    """Page is entirely zero (or beyond the end of the image)."""
+
+    FILL = 1
+    """Page is entirely a single, non-zero byte value, e.g. 0xFF."""
+
+    CONTENT = 2
+    """Page contains anything else."""
+
+
+_UNKNOWN = 0xFF
+
+_SCAN_BLOCK_SIZE = 1 << 20
+
+
+class PageMap:
+    """
+    Classification of every page of an image as zero, fill, or content.
+
+    Pages are classified on demand and remembered, so probing a handful of
+    pages only reads those pages; `scan` classifies the whole image in one
+    pass up front. Until then, the map holds on to the driver, so it must be
+    queried while the driver is open.
+    """
+
+    driver: Driver
+    page_size: int
+
+    _size: int
+    _kinds: bytearray
+
+    def __init__(self, driver: Driver, page_size: int = 0x1000) -> None:
+        self.driver = driver
+        self.page_size = page_size
+
+        self._size = driver.size()
+        self._kinds = bytearray([_UNKNOWN]) * -(-self._size // page_size)
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    @staticmethod
+    def _classify(block: bytes, start: int, end: int) -> PageKind:
+        length = end - start
+        if block.count(0, start, end) == length:
+            return PageKind.ZERO
+        if block.count(block[start], start, end) == length:
+            return PageKind.FILL
+
+        return PageKind.CONTENT
+
+    def _classify_range(self, first: int, count: int):
+        offset = first * self.page_size
+        block = bytes(self.driver.read(offset, count * self.page_size))
+
+        for i in range(count):
+            start = i * self.page_size
+            end = min(start + self.page_size, len(block))
+
+            # Treat anything that couldn't be read like the end of the image.
+            kind = self._classify(block, start, end) if start < end else PageKind.ZERO
+            self._kinds[first + i] = kind
+
+    def scan(self) -> "PageMap":
+        """Classify every page of the image."""
+
+        per_block = max(1, _SCAN_BLOCK_SIZE // self.page_size)
+        for first in range(0, len(self._kinds), per_block):
+            self._classify_range(first, min(per_block, len(self._kinds) - first))
+
+        return self
+
+    def kind(self, offset: int) -> PageKind:
+        """Get the kind of the page containing the given file offset."""
+
+        index = offset // self.page_size
+        if index >= len(self._kinds):
+            return PageKind.ZERO
+
+        if self._kinds[index] == _UNKNOWN:
+            self._classify_range(index, 1)
+
+        return PageKind(self._kinds[index])
+
+    def is_zero(self, offset: int) -> bool:
+        return self.kind(offset) == PageKind.ZERO
+
+    def is_padding(self, offset: int) -> bool:
+        return self.kind(offset) != PageKind.CONTENT
+
+    def runs(
+        self, start: int = 0, end: int | None = None
+    ) -> Iterator[tuple[int, int, PageKind]]:
+        """
+        Get runs of consecutive pages of the same kind between the given file
+        offsets, as (start, end, kind) tuples.
+        """
+
+        end = self._size if end is None else min(end, self._size)
+
+        run_start, run_kind = start, None
+        for offset in range(start - start % self.page_size, end, self.page_size):
+            kind = self.kind(offset)
+            if kind != run_kind:
+                if run_kind is not None:
+                    yield (run_start, offset, run_kind)
+
+                run_start, run_kind = max(offset, start), kind
+
+        if run_kind is not None:
+            yield (run_start, end, run_kind)
+
+    def content_end(self, start: int, end: int) -> int:
+        """
+        Get the end of the last page between the given offsets with non-zero
+        contents, i.e. where trailing zero padding begins.
+        """
+
+        content_end = start
+        for _, run_end, kind in self.runs(start, end):
+            if kind != PageKind.ZERO:
+                content_end = run_end
+
+        return content_end
@@ -1,3 +1,13 @@
+import logging
+from functools import lru_cache
+
+from ibis.context import Context
+from ibis.driver import BufferDriver, Driver
+from ibis.layout import Layout
+from ibis.names import identify_functions
+from ibis.outlined import find_outlined
+from ibis.scan import find_starts
+
 ANALYZE_FAIL_TITLE = "Failed to Analyze Memory Layout"
 ANALYZE_FAIL_MESSAGE = "Ibis couldn't determine the memory layout for this file; a single RWX segment will be used."
 ISSUES_URL = "https://github.com/jonpalmisc/ibis/issues"
@@ -5,3 +15,84 @@ ISSUES_URL = "https://github.com/jonpalmisc/ibis/issues"
 MISSING_BSS_BOUNDS = (
     "WARNING: Couldn't determine BSS segment bounds; using best guess..."
 )
+
+# Outlined function candidates (see `ibis.outlined.find_outlined`) are named
+# with this prefix, so they can be told apart without claiming to be outlined.
+OUTLINED_CANDIDATE_PREFIX = "outlined_candidate_"
+
+
+@lru_cache(maxsize=64)
+def _parse_header(banner: bytes, tag: bytes) -> Context | None:
+    try:
+        return Driver.parse_context(banner, tag)
+    except Exception as e:
+        logging.debug(f"Failed to detect context: {e!r}")
+        return None
+
+
+def probe_context(driver: Driver) -> Context | None:
+    """
+    Detect the context of a file being opened by a disassembler, or `None` if
+    it isn't an iBoot family binary.
+
+    Most files are rejected by a single small read (see `Driver.has_magic`).
+    Contexts are remembered by the contents of the file's header, so probing a
+    file and then loading it only parses the header once.
+    """
+
+    if not driver.has_magic():
+        return None
+
+    banner, tag = driver.read_many(driver.header_ranges())
+    return _parse_header(bytes(banner), bytes(tag))
+
+
+def _searchable(driver: Driver, layout: Layout) -> Driver:
+    """
+    Get a driver for (at least) TEXT and CONST that the scanners can each take
+    a window of (see `Driver.window`) without copying.
+    """
+
+    # Drivers overriding `window` can already provide windows without copying.
+    if type(driver).window is not Driver.window:
+        return driver
+
+    # Otherwise, every window would be a copy, so read everything (CONST
+    # follows TEXT) once up front instead.
+    const = layout.const
+    assert const.file_offset is not None
+
+    haystack, _, _ = driver.window(0, const.file_offset + const.size)
+    return BufferDriver(haystack)
+
+
+def find_functions(driver: Driver, layout: Layout) -> dict[int, str | None]:
+    """
+    Collect the start of every function for a disassembler to create, with its
+    name if known (see `ibis.names.identify_functions`), or a marker name for
+    outlined function candidates (see `OUTLINED_CANDIDATE_PREFIX`).
+    """
+
+    driver = _searchable(driver, layout)
+
+    # Analysis can get confused about function bounds when it fails to detect
+    # no-return functions. A cheap hack is to create functions starting at every
+    # PACIBSP, which shouldn't ever appear in the middle of a function. Images
+    # without pointer authentication fall back to matching other common
+    # prologues instead.
+    prologues = find_starts(driver, layout)
+
+    functions: dict[int, str | None] = dict.fromkeys(prologues)
+
+    # Compiler-outlined helpers have no prologue to find them by. They can't be
+    # told apart from small leaf functions for certain, so are only marked as
+    # candidates.
+    outlined = find_outlined(driver, layout)
+    functions.update(
+        (addr, f"{OUTLINED_CANDIDATE_PREFIX}{addr:x}") for addr in outlined.addresses
+    )
+
+    names = identify_functions(driver, layout, starts=prologues)
+    functions.update({addr: name for name, addr in names.items()})
+
+    return functions
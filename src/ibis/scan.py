@@ -0,0 +1,59 @@
+import struct
+from array import array
+
+from ibis.driver import Driver
+from ibis.layout import Layout, Region
+from ibis.signatures import find_function_starts
+
+PACIBSP = 0xD503237F
+
+
+def find_words(driver: Driver, region: Region, word: int) -> array:
+    """
+    Find every 4-byte aligned occurrence of a (little-endian) instruction word
+    within a region, returned as an array of addresses.
+
+    The region is read in a single request and searched with the driver's
+    substring search, rather than being decoded one word at a time.
+    """
+
+    addrs = array("Q")
+    if region.file_offset is None:
+        return addrs
+
+    needle = struct.pack("<I", word)
+    haystack, lo, hi = driver.window(region.file_offset, region.size)
+
+    i = haystack.find(needle, lo, hi)
+    while i >= 0:
+        if (i - lo) % 4 == 0:
+            addrs.append(region.start + i - lo)
+
+        i = haystack.find(needle, i + 1, hi)
+
+    return addrs
+
+
+def find_prologues(driver: Driver, layout: Layout) -> array:
+    """
+    Find the address of every PACIBSP instruction in TEXT.
+
+    PACIBSP shouldn't ever appear in the middle of a function, which makes it a
+    reliable way to find function starts on images with pointer authentication.
+    """
+
+    return find_words(driver, layout.text, PACIBSP)
+
+
+def find_starts(driver: Driver, layout: Layout) -> array:
+    """
+    Find likely function starts in TEXT: every PACIBSP (see `find_prologues`),
+    or on images without pointer authentication, other common prologues (see
+    `ibis.signatures.find_function_starts`).
+    """
+
+    starts = find_prologues(driver, layout)
+    if not starts:
+        starts = find_function_starts(driver, layout).addresses
+
+    return starts
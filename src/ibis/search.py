@@ -0,0 +1,71 @@
+import heapq
+import mmap
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+Haystack = bytes | bytearray | mmap.mmap
+
+
+class PatternSet:
+    """
+    Set of byte patterns which can be searched for together.
+
+    Each pattern is located with the haystack's own `find`, which is backed by
+    CPython's optimized substring search and (for the small pattern sets used
+    by the analyzer) outperforms scanning with a combined regular expression.
+    Searches are bounded by the best match found so far, so later patterns
+    only have to scan the part of the haystack in front of it.
+    """
+
+    patterns: tuple[bytes, ...]
+    longest: int
+
+    def __init__(self, patterns: Iterable[bytes]) -> None:
+        # Longest first, so that the longest pattern wins when several patterns
+        # match at the same offset.
+        self.patterns = tuple(sorted(set(patterns), key=len, reverse=True))
+        if not self.patterns or not all(self.patterns):
+            raise ValueError("patterns must be non-empty")
+
+        self.longest = len(self.patterns[0])
+
+    def search(
+        self, haystack: Haystack, start: int, end: int
+    ) -> tuple[int, bytes] | None:
+        """
+        Find the lowest offset within `haystack[start:end]` at which any of
+        the patterns occurs, returned alongside the pattern that matched.
+        """
+
+        best, best_pattern = end, None
+        for pattern in self.patterns:
+            # Only a match starting below the current best is of interest.
+            bound = min(end, best + len(pattern) - 1)
+            if (i := haystack.find(pattern, start, bound)) >= 0:
+                best, best_pattern = i, pattern
+
+        return (best, best_pattern) if best_pattern is not None else None
+
+    def finditer(
+        self, haystack: Haystack, start: int, end: int
+    ) -> Iterator[tuple[int, bytes]]:
+        """
+        Find every occurrence of any of the patterns within
+        `haystack[start:end]`, in ascending order. Overlapping occurrences are
+        all reported.
+        """
+
+        def occurrences(pattern: bytes) -> Iterator[tuple[int, bytes]]:
+            i = haystack.find(pattern, start, end)
+            while i >= 0:
+                yield (i, pattern)
+                i = haystack.find(pattern, i + 1, end)
+
+        return heapq.merge(*(occurrences(p) for p in self.patterns))
+
+
+@lru_cache(maxsize=64)
+def compile_patterns(patterns: tuple[bytes, ...]) -> PatternSet:
+    """Get the (cached) pattern set for the given patterns."""
+
+    return PatternSet(patterns)
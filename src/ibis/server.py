@@ -0,0 +1,428 @@
+import base64
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from dataclasses import replace
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from ibis.batch import AnalysisOptions, analyze_driver, open_driver
+from ibis.driver import BufferDriver, Driver
+from ibis.im4p import Im4pDriver, is_im4p
+
+# Largest request accepted: a single line on the Unix socket, or an HTTP body.
+MAX_REQUEST_SIZE = 64 << 20
+
+# Connections are closed once idle for this long (in seconds), or once they've
+# made this many requests, so that no client can hold a worker indefinitely.
+IDLE_TIMEOUT = 30.0
+MAX_CONNECTION_REQUESTS = 1024
+
+
+class RequestError(Exception):
+    pass
+
+
+class ServerStats:
+    """Request counters and latency statistics for a running server."""
+
+    _LATENCY_WINDOW = 1024
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._latencies: deque[float] = deque(maxlen=self._LATENCY_WINDOW)
+
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+
+    def record(self, latency: float, error: bool, cache_hit: bool):
+        with self._lock:
+            self._latencies.append(latency)
+
+            self.requests += 1
+            self.errors += error
+            self.cache_hits += cache_hit
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+
+            def percentile(p: float) -> float | None:
+                return latencies[int(p * (len(latencies) - 1))] if latencies else None
+
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "errors": self.errors,
+                "cache_hits": self.cache_hits,
+                "throughput": self.requests / uptime if uptime else 0.0,
+                "latency": {
+                    "mean": statistics.fmean(latencies) if latencies else None,
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "max": latencies[-1] if latencies else None,
+                },
+            }
+
+
+def _analyze_data(data: bytes, options: AnalysisOptions) -> dict[str, Any]:
+    driver: Driver = BufferDriver(data)
+    if is_im4p(driver):
+        driver = Im4pDriver(driver)
+
+    return analyze_driver(driver, options)
+
+
+def _analyze_path(path: Path, options: AnalysisOptions) -> dict[str, Any]:
+    with open_driver(path) as driver:
+        return analyze_driver(driver, options)
+
+
+class Analyzer:
+    """
+    Shared state for handling analysis requests: the analysis options, an
+    in-memory cache of recent results, and request statistics.
+
+    Requests are JSON objects naming a `path` to analyze or carrying the image
+    itself as base64 `data`, optionally with `functions` set to include
+    function prologues. Responses use the same schema as `ibis --json`.
+
+    Analysis is CPU-bound, so with `processes` set, it runs on a pool of that
+    many worker processes (like `ibis.batch.analyze_paths`) rather than on
+    the thread handling the request; otherwise, it runs on the calling thread.
+    """
+
+    options: AnalysisOptions
+    cache_size: int
+    processes: int
+    stats: ServerStats
+
+    _results: OrderedDict[Any, dict[str, Any]]
+    _pool: ProcessPoolExecutor | None
+    _lock: threading.Lock
+
+    def __init__(
+        self, options: AnalysisOptions, cache_size: int = 1024, processes: int = 0
+    ) -> None:
+        self.options = options
+        self.cache_size = cache_size
+        self.processes = processes
+        self.stats = ServerStats()
+
+        self._results = OrderedDict()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Shut down the worker processes, if any."""
+
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn: Callable[..., dict[str, Any]], *args) -> dict[str, Any]:
+        if not self.processes:
+            return fn(*args)
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.processes)
+
+            pool = self._pool
+
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died, taking the pool (and every request waiting on it)
+            # with it; those requests fail, but later ones get a new pool.
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+
+            pool.shutdown(wait=False)
+            raise
+
+    def _cached(self, key: Any) -> dict[str, Any] | None:
+        with self._lock:
+            if (result := self._results.get(key)) is not None:
+                self._results.move_to_end(key)
+
+            return result
+
+    def _store(self, key: Any, result: dict[str, Any]):
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+    def _analyze(
+        self, request: dict[str, Any], data: bytes | None
+    ) -> tuple[dict[str, Any], bool]:
+        options = replace(self.options, functions=bool(request.get("functions")))
+
+        if data is None and "data" in request:
+            data = base64.b64decode(request["data"], validate=True)
+
+        if data is not None:
+            key = ("data", sha256(data).hexdigest(), options.functions)
+
+            if (result := self._cached(key)) is not None:
+                return result, True
+
+            result = self._run(_analyze_data, data, options)
+        elif "path" in request:
+            path = Path(request["path"]).resolve()
+
+            # Files are assumed to be unchanged if their size and modification
+            # time are, which avoids hashing them on every request.
+            st = path.stat()
+            key = ("path", str(path), st.st_size, st.st_mtime_ns, options.functions)
+
+            if (result := self._cached(key)) is not None:
+                return result, True
+
+            result = self._run(_analyze_path, path, options)
+        else:
+            raise RequestError("request must contain either 'path' or 'data'")
+
+        self._store(key, result)
+        return result, False
+
+    def handle(
+        self, request: dict[str, Any], data: bytes | None = None
+    ) -> dict[str, Any]:
+        """
+        Handle a single request, returning the response. The image to analyze
+        can also be passed directly as `data` rather than in the request.
+        """
+
+        if request.get("op") == "stats":
+            return self.stats.to_dict()
+
+        start = time.perf_counter()
+        cache_hit = False
+
+        try:
+            response, cache_hit = self._analyze(request, data)
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+
+        self.stats.record(time.perf_counter() - start, "error" in response, cache_hit)
+
+        return response
+
+
+class _PoolMixIn:
+    """Mix-in to handle each connection on a bounded pool of worker threads."""
+
+    executor: ThreadPoolExecutor
+
+    _active: set[socket.socket]
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        self._active.add(request)
+
+        try:
+            self.finish_request(request, client_address)  # pyright: ignore[reportAttributeAccessIssue]
+        except Exception:
+            self.handle_error(request, client_address)  # pyright: ignore[reportAttributeAccessIssue]
+        finally:
+            self._active.discard(request)
+            self.shutdown_request(request)  # pyright: ignore[reportAttributeAccessIssue]
+
+    def server_close(self):
+        super().server_close()  # pyright: ignore[reportAttributeAccessIssue]
+
+        # Wake up handlers still waiting on idle connections so they can exit.
+        for request in list(self._active):
+            with suppress(OSError):
+                request.shutdown(socket.SHUT_RDWR)
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    """Handler for newline-delimited JSON requests on a Unix domain socket."""
+
+    server: "UnixServer"
+    timeout = IDLE_TIMEOUT
+
+    def _reply(self, response: dict[str, Any]):
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        with suppress(TimeoutError):
+            for _ in range(MAX_CONNECTION_REQUESTS):
+                line = self.rfile.readline(MAX_REQUEST_SIZE + 1)
+                if not line:
+                    break
+
+                # The rest of an oversized request can't be told apart from the
+                # next one, so the connection is given up on.
+                if len(line) > MAX_REQUEST_SIZE:
+                    error = f"RequestError: request exceeds {MAX_REQUEST_SIZE} bytes"
+                    return self._reply({"error": error})
+
+                if not line.strip():
+                    continue
+
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise RequestError("request must be a JSON object")
+
+                    response = self.server.analyzer.handle(request)
+                except (ValueError, RequestError) as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+
+                self._reply(response)
+
+
+class UnixServer(_PoolMixIn, socketserver.UnixStreamServer):
+    analyzer: Analyzer
+
+    def __init__(self, path: Path, analyzer: Analyzer, executor: ThreadPoolExecutor):
+        self.analyzer = analyzer
+        self.executor = executor
+        self._active = set()
+
+        path.unlink(missing_ok=True)
+        super().__init__(str(path), _UnixHandler)
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    """
+    Handler for HTTP requests: `POST /analyze` with either a JSON request body
+    or the raw image, and `GET /stats`.
+    """
+
+    server: "HTTPServer"
+    timeout = IDLE_TIMEOUT
+
+    def _respond(self, status: int, body: dict[str, Any]):
+        data = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/stats":
+            return self._respond(404, {"error": "not found"})
+
+        self._respond(200, self.server.analyzer.stats.to_dict())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/analyze":
+            return self._respond(404, {"error": "not found"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.close_connection = True
+            return self._respond(400, {"error": "invalid Content-Length"})
+
+        if length > MAX_REQUEST_SIZE:
+            self.close_connection = True
+            return self._respond(
+                413, {"error": f"request exceeds {MAX_REQUEST_SIZE} bytes"}
+            )
+
+        body = self.rfile.read(length)
+        query = parse_qs(url.query)
+
+        request, data = {"functions": query.get("functions") == ["1"]}, None
+        if self.headers.get("Content-Type") == "application/json":
+            try:
+                request.update(json.loads(body))
+            except (ValueError, TypeError) as e:
+                return self._respond(400, {"error": f"invalid request: {e}"})
+        else:
+            data = body
+
+        response = self.server.analyzer.handle(request, data)
+        self._respond(200 if "error" not in response else 422, response)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} - {format % args}")
+
+
+class HTTPServer(_PoolMixIn, ThreadingHTTPServer):
+    analyzer: Analyzer
+
+    def __init__(self, port: int, analyzer: Analyzer, executor: ThreadPoolExecutor):
+        self.analyzer = analyzer
+        self.executor = executor
+        self._active = set()
+
+        super().__init__(("127.0.0.1", port), _HTTPHandler)
+
+
+def serve(
+    analyzer: Analyzer,
+    socket_path: Path | None = None,
+    http_port: int | None = None,
+    workers: int | None = None,
+):
+    """
+    Serve analysis requests on a Unix domain socket and/or localhost HTTP port
+    until interrupted (or terminated).
+    """
+
+    stop = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in [signal.SIGINT, signal.SIGTERM]:
+            signal.signal(sig, lambda *_: stop.set())
+
+    executor = ThreadPoolExecutor(workers or os.cpu_count())
+
+    servers: list[socketserver.BaseServer] = []
+    if socket_path:
+        servers.append(UnixServer(socket_path, analyzer, executor))
+        logging.info(f"Listening on {socket_path}")
+    if http_port is not None:
+        servers.append(HTTPServer(http_port, analyzer, executor))
+        logging.info(f"Listening on http://127.0.0.1:{http_port}")
+
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        stop.wait()
+    finally:
+        logging.info("Shutting down...")
+
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        if socket_path:
+            socket_path.unlink(missing_ok=True)
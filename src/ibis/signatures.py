@@ -0,0 +1,159 @@
+import re
+import struct
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
+
+from ibis.driver import Driver
+from ibis.layout import Layout, Region
+
+
+@dataclass(frozen=True)
+class Signature:
+    """
+    Sequence of instruction patterns indicating the start of a function.
+
+    Each instruction is described by a `(mask, value)` pair, matching any
+    32-bit word where `word & mask == value`.
+    """
+
+    name: str
+    words: tuple[tuple[int, int], ...]
+    score: int
+
+
+SIGNATURES = (
+    Signature("pacibsp", ((0xFFFFFFFF, 0xD503237F),), 3),
+    Signature("paciasp", ((0xFFFFFFFF, 0xD503233F),), 3),
+    Signature("bti c", ((0xFFFFFFFF, 0xD503245F),), 2),
+    Signature("stp x29, x30, [sp, #-N]!", ((0xFFE07FFF, 0xA9A07BFD),), 2),
+    Signature(
+        "sub sp, sp, #N; stp xA, xB, [sp, #M]",
+        ((0xFF8003FF, 0xD10003FF), (0xFFC003E0, 0xA90003E0)),
+        2,
+    ),
+    Signature("stp xA, xB, [sp, #-N]!", ((0xFFE003E0, 0xA9A003E0),), 1),
+)
+"""Signatures for common AArch64 function prologues."""
+
+# Instructions which end a function (or pad between functions); a candidate
+# directly following one of these is more likely to be a real function start.
+_TERMINATORS = (
+    (0xFFFFFFFF, 0xD65F03C0),  # ret
+    (0xFFFFFFFF, 0xD65F0FFF),  # retab
+    (0xFC000000, 0x14000000),  # b
+    (0xFFE0001F, 0xD4200000),  # brk
+    (0xFFFFFFFF, 0xD503201F),  # nop
+    (0xFFFFFFFF, 0x00000000),  # udf
+)
+
+_WORD = struct.Struct("<I")
+
+
+class Candidates(NamedTuple):
+    """Function start candidates, in ascending order of address."""
+
+    addresses: array
+    """Address of each candidate (`array('Q')`)."""
+
+    scores: array
+    """Score of each candidate (`array('B')`); higher is more likely."""
+
+
+def _byte_class(mask: int, value: int) -> bytes:
+    if mask == 0xFF:
+        return re.escape(bytes([value]))
+    if mask == 0:
+        return b"."
+
+    matches = bytes(b for b in range(256) if b & mask == value & mask)
+    return b"[" + b"".join(re.escape(bytes([b])) for b in matches) + b"]"
+
+
+def _word_pattern(mask: int, value: int) -> bytes:
+    # Words are little-endian, so the lowest byte comes first.
+    return b"".join(
+        _byte_class((mask >> shift) & 0xFF, (value >> shift) & 0xFF)
+        for shift in (0, 8, 16, 24)
+    )
+
+
+@lru_cache(maxsize=16)
+def compile_signatures(
+    signatures: tuple[Signature, ...],
+) -> tuple[re.Pattern[bytes], tuple[Signature, ...]]:
+    """
+    Compile signatures into a single regular expression matching (with a
+    zero-width match) at the start of any of them, returned alongside the
+    signatures in the order of the pattern's groups.
+
+    Signatures are ordered by descending score, so that where several match
+    at the same position, the highest scoring one is reported.
+    """
+
+    ordered = tuple(sorted(signatures, key=lambda s: -s.score))
+
+    alternatives = (
+        b"(" + b"".join(_word_pattern(m, v) for m, v in signature.words) + b")"
+        for signature in ordered
+    )
+
+    return re.compile(b"(?=" + b"|".join(alternatives) + b")", re.DOTALL), ordered
+
+
+def match_signatures(
+    driver: Driver, region: Region, signatures: tuple[Signature, ...] = SIGNATURES
+) -> Candidates:
+    """
+    Find every 4-byte aligned match of any of the given signatures within a
+    region, in a single pass.
+
+    Each candidate is scored by the best signature matching there, plus one if
+    it directly follows an instruction ending the previous function.
+    """
+
+    addresses, scores = array("Q"), array("B")
+    if region.file_offset is None:
+        return Candidates(addresses, scores)
+
+    pattern, ordered = compile_signatures(signatures)
+    haystack, lo, hi = driver.window(region.file_offset, region.size)
+
+    for match in pattern.finditer(haystack, lo, hi):
+        i = match.start()
+        if (i - lo) % 4:
+            continue
+
+        score = ordered[match.lastindex - 1].score  # pyright: ignore[reportOptionalOperand]
+        if i - lo >= 4:
+            (previous,) = _WORD.unpack_from(haystack, i - 4)
+            if any(previous & m == v for m, v in _TERMINATORS):
+                score += 1
+
+        addresses.append(region.start + i - lo)
+        scores.append(score)
+
+    return Candidates(addresses, scores)
+
+
+def find_function_starts(
+    driver: Driver, layout: Layout, min_score: int = 2
+) -> Candidates:
+    """
+    Find likely function starts in TEXT by their prologues (see `SIGNATURES`),
+    keeping only candidates scoring at least `min_score`.
+
+    Unlike `ibis.scan.find_prologues`, this doesn't depend on the image using
+    pointer authentication.
+    """
+
+    candidates = match_signatures(driver, layout.text)
+    if not min_score:
+        return candidates
+
+    keep = [i for i, score in enumerate(candidates.scores) if score >= min_score]
+    return Candidates(
+        array("Q", (candidates.addresses[i] for i in keep)),
+        array("B", (candidates.scores[i] for i in keep)),
+    )
@@ -0,0 +1,167 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from weakref import WeakKeyDictionary
+
+from ibis.driver import Driver
+from ibis.layout import Region
+
+_PRINTABLE = rb"[\t\n\r\x20-\x7e]"
+
+_INDEXES: "WeakKeyDictionary[Driver, dict[tuple, StringIndex]]" = WeakKeyDictionary()
+
+
+class StringIndex:
+    """
+    Index of the NUL-terminated, printable strings in (a region of) an image.
+
+    Strings are extracted in a single pass and kept in compact arrays, with a
+    hash table for exact lookups; prefix and substring queries are answered
+    without touching the image again. Queries return string indices, which
+    are in ascending order of offset.
+    """
+
+    offsets: array
+    """File offset of each string (`array('Q')`)."""
+
+    addresses: array
+    """Address of each string (`array('Q')`), or its offset if unmapped."""
+
+    _blob: bytes
+    _starts: array
+    _first: dict[bytes, int]
+    _next: array
+    _sorted: list[int] | None
+
+    def __init__(
+        self, driver: Driver, region: Region | None = None, min_length: int = 4
+    ) -> None:
+        if region is None:
+            offset, size, base = 0, driver.size(), 0
+        else:
+            assert region.file_offset is not None
+            offset, size, base = region.file_offset, region.size, region.start
+
+        # Runs are matched whole and their terminator checked separately; a
+        # lookahead for it would be retried at every offset of a long run with
+        # no terminator, which is quadratic.
+        pattern = re.compile(_PRINTABLE + b"{%d,}" % min_length)
+        haystack, lo, hi = driver.window(offset, size)
+
+        self.offsets, self.addresses = array("Q"), array("Q")
+        self._starts = array("I")
+        self._first = {}
+        self._next = array("i")
+        self._sorted = None
+
+        # Strings are stored back to back (keeping their terminators) so that
+        # substring queries are a search of a single buffer.
+        strings = []
+        last: dict[bytes, int] = {}
+        position = 0
+        for match in pattern.finditer(haystack, lo, hi):
+            if match.end() >= hi or haystack[match.end()] != 0:
+                continue
+
+            string = match[0]
+            i = len(strings)
+
+            self.offsets.append(offset + match.start() - lo)
+            self.addresses.append(base + match.start() - lo)
+            self._starts.append(position)
+            position += len(string) + 1
+
+            # Repeated strings are chained together, in order.
+            self._next.append(-1)
+            if string in last:
+                self._next[last[string]] = i
+            else:
+                self._first[string] = i
+            last[string] = i
+
+            strings.append(string)
+
+        self._starts.append(position)
+        self._blob = b"\x00".join(strings) + b"\x00"
+
+    @classmethod
+    def for_driver(
+        cls, driver: Driver, region: Region | None = None, min_length: int = 4
+    ) -> "StringIndex":
+        """
+        Get the index of a driver's strings, building it the first time it is
+        needed and sharing it afterwards.
+        """
+
+        key = (region, min_length)
+        indexes = _INDEXES.setdefault(driver, {})
+        if key not in indexes:
+            indexes[key] = cls(driver, region, min_length)
+
+        return indexes[key]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> bytes:
+        """Get a string (without its terminator)."""
+
+        if i < 0:
+            i += len(self)
+
+        return self._blob[self._starts[i] : self._starts[i + 1] - 1]
+
+    def at(self, address: int) -> int | None:
+        """Find the string starting at an address, if any."""
+
+        i = bisect_left(self.addresses, address)
+        if i < len(self) and self.addresses[i] == address:
+            return i
+
+        return None
+
+    def exact(self, string: bytes) -> list[int]:
+        """Find every occurrence of a string."""
+
+        matches = []
+
+        i = self._first.get(string, -1)
+        while i >= 0:
+            matches.append(i)
+            i = self._next[i]
+
+        return matches
+
+    def prefix(self, prefix: bytes) -> list[int]:
+        """Find every string starting with a prefix."""
+
+        if self._sorted is None:
+            self._sorted = sorted(range(len(self)), key=self.__getitem__)
+
+        first = bisect_left(self._sorted, prefix, key=self.__getitem__)
+
+        matches = []
+        for i in self._sorted[first:]:
+            if not self[i].startswith(prefix):
+                break
+            matches.append(i)
+
+        return sorted(matches)
+
+    def substring(self, needle: bytes) -> list[int]:
+        """Find every string containing a substring."""
+
+        if not needle or b"\x00" in needle:
+            raise ValueError(f"invalid substring: {needle!r}")
+
+        matches = []
+
+        position = self._blob.find(needle)
+        while position >= 0:
+            i = bisect_right(self._starts, position) - 1
+            matches.append(i)
+
+            # Only report each string once, however many times it matches.
+            position = self._blob.find(needle, self._starts[i + 1])
+
+        return matches
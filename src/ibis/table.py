@@ -0,0 +1,287 @@
+import csv
+import json
+from array import array
+from collections.abc import Iterable
+from typing import Any, TextIO
+
+from ibis.context import App, Context
+from ibis.layout import Layout, Region
+
+REGION_NAMES = ("TEXT", "CONST", "DATA", "BSS")
+
+_APPS = list(App)
+
+# Stands in for missing values (absent regions, unmapped offsets); addresses
+# come from signed 64-bit fields, so can never take this value themselves.
+_NONE = -(1 << 63)
+
+
+class _Strings:
+    """Interned strings, referred to by ID."""
+
+    values: list[str]
+
+    _ids: dict[str, int]
+
+    def __init__(self) -> None:
+        self.values = []
+        self._ids = {}
+
+    def intern(self, value: str) -> int:
+        if (i := self._ids.get(value)) is None:
+            i = self._ids[value] = len(self.values)
+            self.values.append(value)
+
+        return i
+
+    def id(self, value: str) -> int | None:
+        return self._ids.get(value)
+
+
+class LayoutTable:
+    """
+    Many analysis results, stored column-wise in compact arrays rather than
+    as individual objects, for aggregating results across large corpora.
+
+    Each row holds a path, the context (app, version, and target), and the
+    start, end, and file offset of each region of the layout. Strings are
+    interned, so each row of a column is a single machine integer.
+    """
+
+    paths: list[str]
+    """Path of each row."""
+
+    apps: array
+    """App of each row (`array('B')`), as an index into `ibis.context.App`."""
+
+    majors: array
+    """Major version of each row (`array('I')`)."""
+
+    versions: array
+    """Full version string ID of each row (`array('I')`)."""
+
+    targets: array
+    """Target ID of each row (`array('I')`)."""
+
+    starts: dict[str, array]
+    ends: dict[str, array]
+    offsets: dict[str, array]
+    """Start, end, and file offset of each region, by region name."""
+
+    _versions: _Strings
+    _targets: _Strings
+
+    def __init__(self) -> None:
+        self.paths = []
+        self.apps = array("B")
+        self.majors = array("I")
+        self.versions = array("I")
+        self.targets = array("I")
+
+        self.starts = {name: array("q") for name in REGION_NAMES}
+        self.ends = {name: array("q") for name in REGION_NAMES}
+        self.offsets = {name: array("q") for name in REGION_NAMES}
+
+        self._versions = _Strings()
+        self._targets = _Strings()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def append(self, path: str, context: Context, layout: Layout):
+        self.paths.append(path)
+        self.apps.append(_APPS.index(context.app))
+        self.majors.append(context.version.major)
+        self.versions.append(self._versions.intern(str(context.version)))
+        self.targets.append(self._targets.intern(context.target))
+
+        regions = dict(layout.regions())
+        for name in REGION_NAMES:
+            region = regions.get(name)
+
+            self.starts[name].append(_NONE if region is None else region.start)
+            self.ends[name].append(_NONE if region is None else region.end)
+            self.offsets[name].append(
+                _NONE
+                if region is None or region.file_offset is None
+                else region.file_offset
+            )
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict[str, Any]]) -> "LayoutTable":
+        """
+        Build a table from result records, e.g. from `ibis.batch.analyze_paths`
+        or `ibis --json`. Records of failed analyses are skipped.
+        """
+
+        table = cls()
+        for record in records:
+            if "error" in record:
+                continue
+
+            table.append(
+                record.get("path", ""),
+                Context.from_dict(record),
+                Layout.from_dict(record["regions"]),
+            )
+
+        return table
+
+    def target(self, i: int) -> str:
+        return self._targets.values[self.targets[i]]
+
+    def version(self, i: int) -> str:
+        return self._versions.values[self.versions[i]]
+
+    def context(self, i: int) -> Context:
+        return Context.from_dict(
+            {
+                "app": str(_APPS[self.apps[i]]),
+                "version": self.version(i),
+                "target": self.target(i),
+            }
+        )
+
+    def region(self, name: str, i: int) -> Region | None:
+        start, end = self.starts[name][i], self.ends[name][i]
+        if start == _NONE:
+            return None
+
+        offset = self.offsets[name][i]
+        return Region(start, end, None if offset == _NONE else offset)
+
+    def layout(self, i: int) -> Layout:
+        return Layout(*(self.region(name, i) for name in REGION_NAMES))  # pyright: ignore[reportArgumentType]
+
+    def record(self, i: int) -> dict[str, Any]:
+        """Get a row in the same form as `ibis --json` results."""
+
+        return {
+            "path": self.paths[i],
+            **self.context(i).to_dict(),
+            "regions": self.layout(i).to_dict(),
+        }
+
+    def take(self, rows: Iterable[int]) -> "LayoutTable":
+        """Get a new table with only the given rows, in the given order."""
+
+        rows = list(rows)
+        table = LayoutTable()
+
+        table.paths = [self.paths[i] for i in rows]
+        table.apps = array("B", (self.apps[i] for i in rows))
+        table.majors = array("I", (self.majors[i] for i in rows))
+        table.versions = array("I", (self.versions[i] for i in rows))
+        table.targets = array("I", (self.targets[i] for i in rows))
+
+        for name in REGION_NAMES:
+            table.starts[name] = array("q", (self.starts[name][i] for i in rows))
+            table.ends[name] = array("q", (self.ends[name][i] for i in rows))
+            table.offsets[name] = array("q", (self.offsets[name][i] for i in rows))
+
+        # IDs stay valid as long as the interned strings are shared.
+        table._versions = self._versions
+        table._targets = self._targets
+
+        return table
+
+    def filter(
+        self,
+        app: App | None = None,
+        major: int | None = None,
+        target: str | None = None,
+    ) -> "LayoutTable":
+        """Get a new table with only the rows matching all of the given values."""
+
+        columns = []
+        if app is not None:
+            columns.append((self.apps, _APPS.index(app)))
+        if major is not None:
+            columns.append((self.majors, major))
+        if target is not None:
+            # Targets which were never seen can't match anything.
+            columns.append((self.targets, self._targets.id(target)))
+
+        rows = range(len(self))
+        for column, value in columns:
+            rows = [i for i in rows if column[i] == value]
+
+        return self.take(rows)
+
+    def group_by(self, *keys: str) -> dict[tuple, "LayoutTable"]:
+        """
+        Split the table into groups of rows sharing the same values for each of
+        the given keys (any of `app`, `major`, `version`, or `target`).
+        """
+
+        decode = {
+            "app": lambda i: _APPS[self.apps[i]],
+            "major": lambda i: self.majors[i],
+            "version": self.version,
+            "target": self.target,
+        }
+        for key in keys:
+            if key not in decode:
+                raise ValueError(f"unknown group key: {key}")
+
+        # Group on the raw column values, and only decode each group's key.
+        columns = [
+            {
+                "app": self.apps,
+                "major": self.majors,
+                "version": self.versions,
+                "target": self.targets,
+            }[key]
+            for key in keys
+        ]
+
+        groups: dict[tuple, list[int]] = {}
+        for i, values in enumerate(zip(*columns, strict=True)):
+            groups.setdefault(values, []).append(i)
+
+        return {
+            tuple(decode[key](rows[0]) for key in keys): self.take(rows)
+            for rows in groups.values()
+        }
+
+    def to_csv(self, file: TextIO):
+        """Write the table as CSV, with one column per region field."""
+
+        writer = csv.writer(file)
+        writer.writerow(
+            [
+                "path",
+                "app",
+                "version",
+                "target",
+                *(
+                    f"{name.lower()}_{field}"
+                    for name in REGION_NAMES
+                    for field in ("start", "end", "offset")
+                ),
+            ]
+        )
+
+        for i in range(len(self)):
+            row: list[Any] = [
+                self.paths[i],
+                str(_APPS[self.apps[i]]),
+                self.version(i),
+                self.target(i),
+            ]
+            for name in REGION_NAMES:
+                row.extend(
+                    "" if v == _NONE else v
+                    for v in (
+                        self.starts[name][i],
+                        self.ends[name][i],
+                        self.offsets[name][i],
+                    )
+                )
+
+            writer.writerow(row)
+
+    def to_ndjson(self, file: TextIO):
+        """Write the table as JSON Lines, one `ibis --json` record per row."""
+
+        file.writelines(json.dumps(self.record(i)) + "\n" for i in range(len(self)))
@@ -1,9 +1,22 @@
 import logging
+import struct
 from collections.abc import Generator
 from pathlib import Path
 
+from ibis.driver import BufferDriver
+from ibis.layout import Layout, Region
+
 CORPUS_PATH = Path(__file__).parent.parent / "corpus"
 
+RET = 0xD65F03C0
+MOV = 0xAA0103E0  # mov x0, x1
+
+
+def bl(pc: int, target: int) -> int:
+    """Encode `bl target`, for an instruction at `pc`."""
+
+    return 0x94000000 | ((target - pc) // 4) & 0x3FFFFFF
+
 
 def open_corpus_binary(name: str):
     """Open a binary from the corpus."""
@@ -14,3 +27,25 @@ def open_corpus_binary(name: str):
 
 def gauntlet_binaries() -> Generator[Path]:
     return (CORPUS_PATH / "gauntlet").iterdir()
+
+
+def code_image(
+    code: list[int], const: bytes = b"", base: int = 0x1000
+) -> tuple[BufferDriver, Layout]:
+    """
+    Build an image with the given instructions in TEXT at `base`, followed by
+    CONST (holding `const`) and DATA on the pages after it.
+    """
+
+    text = struct.pack(f"<{len(code)}I", *code)
+    const = const.ljust(0x100, b"\x00")
+
+    data = text.ljust(0x1000, b"\x00") + const + bytes(0x100)
+    layout = Layout(
+        text=Region(base, base + len(text), 0),
+        const=Region(base + 0x1000, base + 0x1000 + len(const), 0x1000),
+        data=Region(base + 0x2000, base + 0x2100, 0x1000 + len(const)),
+        bss=None,
+    )
+
+    return BufferDriver(data), layout
@@ -0,0 +1,131 @@
+import asyncio
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ibis.aio import AsyncDriver, HTTPRangeDriver, analyze_async, analyze_many_async
+from ibis.analyzer import analyze
+from ibis.context import BannerParseError
+from ibis.driver import BufferDriver
+
+
+def _image(size: int = 0x40000) -> bytes:
+    """Build a minimal (but analyzable) iBoot image."""
+
+    image = bytearray(b"\xaa" * size)
+    image[0x200:0x240] = b"iBoot for n104, Copyright 2007-2021, Apple Inc.".ljust(
+        0x40, b"\x00"
+    )
+    image[0x280:0x2C0] = b"iBoot-7429.12.15".ljust(0x40, b"\x00")
+
+    base = 0x1FC000000
+    const_end = size - 0x10000
+    table = [
+        base,
+        0,
+        base + const_end + 0x100,
+        0,
+        0,
+        0,
+        0,
+        base + size + 0x3000,
+        base + size + 0x10000,
+    ]
+    image[0x300:0x360] = struct.pack("12q", *table, 0, 0, 0)
+
+    image[0x24010:0x24019] = b"nor0\x00abc\x00"
+    image[const_end : const_end + 0x4000] = bytes(0x4000)
+
+    return bytes(image)
+
+
+class _MemoryDriver(AsyncDriver):
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.reads = 0
+
+    async def read(self, offset: int, size: int) -> bytes:
+        self.reads += 1
+        await asyncio.sleep(0)
+        return self.data[offset : offset + size]
+
+    async def size(self) -> int:
+        return len(self.data)
+
+
+def test_analyze_async():
+    image = _image()
+    driver = _MemoryDriver(image)
+
+    layout = asyncio.run(analyze_async(driver))
+    assert layout == analyze(BufferDriver(image))
+
+    # Everything should have been fetched up front, a block at a time.
+    assert driver.reads <= len(image) // 0x10000
+
+
+def test_analyze_async_large():
+    image = _image(0x1000000)
+    driver = _MemoryDriver(image)
+
+    layout = asyncio.run(analyze_async(driver))
+    assert layout == analyze(BufferDriver(image))
+
+    # Only what the heuristics need should be fetched, not the whole image.
+    assert driver.reads <= 8
+
+
+def test_analyze_many_async():
+    drivers = [_MemoryDriver(_image()), _MemoryDriver(bytes(0x1000))]
+    good, bad = asyncio.run(analyze_many_async(drivers, concurrency=1))
+
+    assert good == analyze(BufferDriver(_image()))
+    assert isinstance(bad, BannerParseError)
+
+
+@pytest.fixture
+def range_server():
+    data = bytes(range(256)) * 0x10
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            first, last = map(int, self.headers["Range"][6:].split("-"))
+            body = data[first : last + 1]
+
+            self.send_response(206)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(data)}")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}/image", data
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_range_driver(range_server):
+    url, data = range_server
+
+    async def run():
+        driver = HTTPRangeDriver(url)
+        return await asyncio.gather(
+            driver.size(),
+            driver.read(0x10, 0x20),
+            driver.read(len(data) - 4, 0x10),
+            driver.read(len(data), 0x10),
+        )
+
+    size, middle, end, beyond = asyncio.run(run())
+    assert size == len(data)
+    assert middle == data[0x10:0x30]
+    assert end == data[-4:]
+    assert beyond == b""
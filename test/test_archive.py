@@ -0,0 +1,101 @@
+import gzip
+import io
+import random
+import tarfile
+import zipfile
+import zlib
+from pathlib import Path
+
+import pytest
+
+import ibis.archive
+from ibis.archive import (
+    ArchiveError,
+    InflateDriver,
+    TarMemberDriver,
+    ZipMemberDriver,
+    match_members,
+    open_member,
+    split_archive_path,
+)
+from ibis.driver import BufferDriver
+
+_PAYLOAD = random.Random(0).randbytes(0x800) * 0x20
+
+
+def _zip(compression: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        archive.writestr("Firmware/all_flash/iBoot.d83.RELEASE.im4p", _PAYLOAD)
+        archive.writestr("Firmware/all_flash/iBoot.d84.RELEASE.im4p", b"other")
+        archive.writestr("BuildManifest.plist", b"<plist/>")
+
+    return buffer.getvalue()
+
+
+def _tar(mode: str) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in [("manifest", b"<plist/>"), ("iBoot.im4p", _PAYLOAD)]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_zip_member(compression):
+    source = BufferDriver(_zip(compression))
+    driver = ZipMemberDriver(source, "Firmware/*/iBoot.d83.*")
+
+    assert driver.name == "Firmware/all_flash/iBoot.d83.RELEASE.im4p"
+    assert driver.size() == len(_PAYLOAD)
+    assert bytes(driver.read(0x7FF0, 0x20)) == _PAYLOAD[0x7FF0:0x8010]
+    assert bytes(driver.read(len(_PAYLOAD) - 4, 8)) == _PAYLOAD[-4:]
+
+    with pytest.raises(ArchiveError, match="found 2"):
+        ZipMemberDriver(source, "Firmware/all_flash/iBoot*")
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz"])
+def test_tar_member(mode):
+    source = BufferDriver(_tar(mode))
+    driver = open_member(source, "iBoot.im4p")
+
+    assert isinstance(driver, TarMemberDriver)
+    assert bytes(driver.read(0, len(_PAYLOAD) + 0x10)) == _PAYLOAD
+    assert match_members(source, "*.im4p") == ["iBoot.im4p"]
+
+
+def test_inflate_checkpoints(monkeypatch):
+    monkeypatch.setattr(ibis.archive, "_CHECKPOINT_SPACING", 0x1000)
+
+    driver = InflateDriver(BufferDriver(gzip.compress(_PAYLOAD)), wbits=31)
+    assert driver.size() == len(_PAYLOAD)
+    assert len(driver._outputs) > 4
+
+    # Searching backwards revisits spans in reverse, starting from checkpoints.
+    needle = _PAYLOAD[0x123:0x133]
+    assert driver.find_any([needle], 0, len(_PAYLOAD), 0x1000, backwards=True) == 0xF123
+    assert bytes(driver.read(0x3FF8, 0x10)) == _PAYLOAD[0x3FF8:0x4008]
+
+
+def test_inflate_raw():
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    data = compressor.compress(_PAYLOAD) + compressor.flush()
+
+    driver = InflateDriver(BufferDriver(b"junk" + data), 4, len(data), len(_PAYLOAD))
+    assert bytes(driver.read(0x10, 0x10)) == _PAYLOAD[0x10:0x20]
+
+
+def test_split_archive_path(tmp_path):
+    assert split_archive_path("a.ipsw!Firmware/iBoot*") == (
+        Path("a.ipsw"),
+        "Firmware/iBoot*",
+    )
+    assert split_archive_path("iBoot") == (Path("iBoot"), None)
+
+    # Files which happen to contain the separator aren't archive members.
+    (tmp_path / "iBoot!1").write_bytes(b"")
+    assert split_archive_path(tmp_path / "iBoot!1") == (tmp_path / "iBoot!1", None)
@@ -0,0 +1,79 @@
+import os
+import zipfile
+from pathlib import Path
+
+from ibis import batch
+from ibis.batch import analyze_path, analyze_paths, expand_inputs
+
+
+def test_expand_inputs(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "iBoot-1").write_bytes(b"")
+    (tmp_path / "a" / "iBoot-2").write_bytes(b"")
+    (tmp_path / "SecureROM-1").write_bytes(b"")
+
+    assert list(expand_inputs([str(tmp_path / "a")])) == [
+        tmp_path / "a" / "iBoot-1",
+        tmp_path / "a" / "iBoot-2",
+    ]
+    assert list(expand_inputs([str(tmp_path / "**" / "iBoot-*")])) == [
+        tmp_path / "a" / "iBoot-1",
+        tmp_path / "a" / "iBoot-2",
+    ]
+    assert list(
+        expand_inputs([str(tmp_path / "SecureROM-1"), str(tmp_path / "missing")])
+    ) == [
+        tmp_path / "SecureROM-1",
+        tmp_path / "missing",
+    ]
+
+
+def test_analyze_path_error(tmp_path):
+    path = tmp_path / "junk"
+    path.write_bytes(b"\x00" * 0x400)
+
+    record = analyze_path(path)
+    assert record["path"] == str(path)
+    assert record["error"].startswith("BannerParseError")
+
+    # Empty files can't be mapped, but should fail just the same.
+    path.write_bytes(b"")
+    assert analyze_path(path)["error"].startswith("BannerParseError")
+
+
+def test_analyze_paths_parallel(tmp_path):
+    paths = [tmp_path / "missing-1", tmp_path / "missing-2"]
+
+    records = list(analyze_paths(paths, jobs=2))
+    assert sorted(r["path"] for r in records) == [str(p) for p in paths]
+    assert all("FileNotFoundError" in r["error"] for r in records)
+
+
+def _crash(path, _):
+    os._exit(1)
+
+
+def test_analyze_paths_crash(tmp_path, monkeypatch):
+    paths = [tmp_path / "crash-1", tmp_path / "crash-2"]
+
+    # Workers are forked, so they see the patched function too.
+    monkeypatch.setattr(batch, "analyze_path", _crash)
+
+    records = list(analyze_paths(paths, jobs=2))
+    assert sorted(r["path"] for r in records) == [str(p) for p in paths]
+    assert all(r["error"].startswith("BrokenProcessPool") for r in records)
+
+
+def test_expand_inputs_archive(tmp_path):
+    with zipfile.ZipFile(tmp_path / "a.ipsw", "w") as archive:
+        archive.writestr("iBoot.d83.im4p", b"")
+        archive.writestr("iBoot.d84.im4p", b"")
+        archive.writestr("LLB.d83.im4p", b"")
+
+    assert list(expand_inputs([f"{tmp_path}/*.ipsw!iBoot*"])) == [
+        Path(f"{tmp_path}/a.ipsw!iBoot.d83.im4p"),
+        Path(f"{tmp_path}/a.ipsw!iBoot.d84.im4p"),
+    ]
+
+    record = analyze_path(Path(f"{tmp_path}/a.ipsw!missing"))
+    assert record["error"].startswith("ArchiveError")
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+
+from ibis.cache import LayoutCache, analyze_cached, content_hash
+from ibis.context import Context
+from ibis.driver import BufferDriver
+from ibis.layout import Layout, Region
+
+CONTEXT = Context("SecureROM for t8015si, Copyright", "SecureROM-3332.0.0.1.23")
+LAYOUT = Layout(
+    text=Region(0x100000000, 0x100017240, 0),
+    const=Region(0x100017240, 0x10001B988, 0x17240),
+    data=Region(0x180000000, 0x180001100, 0x1C000),
+    bss=Region(0x180001100, 0x180008F88),
+)
+
+
+def test_content_hash():
+    data = bytes(range(256)) * 0x2000
+    assert content_hash(BufferDriver(data)) == sha256(data).hexdigest()
+
+
+def test_cache_get_put(tmp_path):
+    cache = LayoutCache(tmp_path)
+    assert cache.get("abcd") is None
+
+    cache.put("abcd", CONTEXT, LAYOUT)
+
+    context, layout = cache.get("abcd")  # pyright: ignore[reportGeneralTypeIssues]
+    assert context.to_dict() == CONTEXT.to_dict()
+    assert layout == LAYOUT
+
+    cache.clear()
+    assert cache.get("abcd") is None
+
+
+def test_cache_put_threads(tmp_path):
+    cache = LayoutCache(tmp_path)
+
+    # Threads of one process writing the same entry mustn't trip each other up.
+    with ThreadPoolExecutor(8) as executor:
+        for _ in executor.map(lambda _: cache.put("abcd", CONTEXT, LAYOUT), range(64)):
+            pass
+
+    assert [p.name for p in tmp_path.iterdir()] == [cache._entry_path("abcd").name]
+    assert cache.get("abcd") is not None
+
+
+def test_cache_evict(tmp_path):
+    cache = LayoutCache(tmp_path)
+    cache.put("key0", CONTEXT, LAYOUT)
+
+    # Make room for exactly three entries.
+    cache.max_size = cache._entry_path("key0").stat().st_size * 3
+
+    for i in range(1, 3):
+        cache.put(f"key{i}", CONTEXT, LAYOUT)
+    for i in range(3):
+        os.utime(cache._entry_path(f"key{i}"), (i, i))
+
+    # The least recently used entry should be evicted first.
+    cache.get("key0")
+    cache.put("key3", CONTEXT, LAYOUT)
+
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+    assert cache.get("key2") is not None
+    assert cache.get("key3") is not None
+
+
+def test_analyze_cached_hit(tmp_path):
+    driver = BufferDriver(b"\x00" * 0x1000)
+
+    cache = LayoutCache(tmp_path)
+    cache.put(content_hash(driver), CONTEXT, LAYOUT)
+
+    # The driver doesn't hold a valid image, so this can only succeed by
+    # skipping analysis entirely.
+    _, layout = analyze_cached(driver, cache)
+    assert layout == LAYOUT
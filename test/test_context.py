@@ -3,10 +3,12 @@ import pytest
 from ibis.context import (
     App,
     BannerParseError,
+    Context,
     TagParseError,
     UnsupportedAppError,
     Version,
     _parse_banner,
+    has_banner_magic,
 )
 
 
@@ -49,3 +51,26 @@ def test_parse_banner():
         _parse_banner("iBootStage2 di t6030si, Copyright")
     with pytest.raises(BannerParseError):
         _parse_banner("iBootfort6030si, Copyright")
+
+
+def test_banner_magic():
+    assert has_banner_magic(b"SecureROM for t8110si, Copyright")
+    assert has_banner_magic(b"iBootStage2 for t6030si, Copyright")
+    assert has_banner_magic(b"iBEC for n104, Copyright")
+
+    assert not has_banner_magic(b"")
+    assert not has_banner_magic(b"\x00" * 0x40)
+    assert not has_banner_magic(b"iBootfort6030si, Copyright")
+    assert not has_banner_magic(b"iBootStage3 for t6030si, Copyright")
+
+
+def test_context_dict_round_trip():
+    context = Context("iBootStage2 for t6030si, Copyright", "iBoot-11881.0.167.0.1")
+
+    obj = context.to_dict()
+    assert obj == {
+        "app": "iBootStage2",
+        "version": "11881.0.167.0.1",
+        "target": "t6030si",
+    }
+    assert Context.from_dict(obj).to_dict() == obj
@@ -1,6 +1,12 @@
 from io import BytesIO
 
-from ibis.driver import BinaryIODriver
+from ibis.driver import (
+    BinaryIODriver,
+    BufferDriver,
+    CachedDriver,
+    InstrumentedDriver,
+    MmapDriver,
+)
 
 
 def test_driver_read_basic():
@@ -16,3 +22,181 @@ def test_driver_read_str():
 
     assert driver.read_str(8, 16) == "Hello, world!"
     assert driver.read_str(8, 5) == "Hello"
+
+
+def test_driver_read_into():
+    bio = BytesIO(b"A" * 8 + b"B" * 8)
+    driver = BinaryIODriver(bio)
+
+    buffer = bytearray(8)
+    assert driver.read_into(4, buffer) == 8
+    assert buffer == b"AAAABBBB"
+
+    assert driver.read_into(12, buffer) == 4
+    assert buffer[:4] == b"BBBB"
+
+
+def test_driver_has_magic():
+    image = bytearray(0x300)
+    image[0x200:0x220] = b"iBoot for n104, Copyright 2007"
+
+    assert BufferDriver(bytes(image)).has_magic()
+    assert not BufferDriver(bytes(0x300)).has_magic()
+    assert not BufferDriver(b"short").has_magic()
+
+
+def test_driver_read_many():
+    data = bytes(range(256)) * 0x40
+    driver = InstrumentedDriver(BinaryIODriver(BytesIO(data)))
+
+    ranges = [(0x300, 0x60), (0x200, 0x40), (0x280, 0x40), (0x3000, 8), (0x3FFC, 8)]
+    views = driver.read_many(ranges)
+
+    assert [bytes(v) for v in views] == [data[o : o + n] for o, n in ranges]
+
+    # The first three ranges are close enough to be read together, as are the
+    # last two (which runs past the end of the data).
+    assert [(r.offset, r.size) for r in driver.stats().reads] == [
+        (0x200, 0x160),
+        (0x3000, 0x1000),
+    ]
+
+
+def test_buffer_driver_zero_copy():
+    data = bytearray(b"A" * 8 + b"B" * 8)
+    driver = BufferDriver(data)
+
+    view = driver.read(4, 8)
+    assert isinstance(view, memoryview)
+    assert view == b"AAAABBBB"
+    assert driver.size() == 16
+
+    data[4] = ord("C")
+    assert view == b"CAAABBBB"
+
+    buffer = bytearray(4)
+    assert driver.read_into(14, buffer) == 2
+    assert buffer[:2] == b"BB"
+
+
+def test_mmap_driver(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"\xff" * 8 + b"Hello, world!\x00" + b"\xff" * 8)
+
+    with path.open("rb") as f, MmapDriver(f) as driver:
+        assert driver.size() == 30
+        assert driver.read_str(8, 16) == "Hello, world!"
+        assert driver.find_any([b"world"], 0, driver.size(), 0x20) == 15
+
+
+def test_driver_find_any_chunk_boundary():
+    data = b"\xff" * 0x7FC + b"arch_vtop\x00" + b"\xff" * 0x1000
+    driver = BinaryIODriver(BytesIO(data))
+
+    assert driver.find_any([b"arch_vtop\x00"], 0, len(data), 0x800) == 0x7FC
+    assert driver.find_any([b"arch_vtop\x00"], 0, len(data), 0x800, True) == 0x7FC
+
+    # Matches below the last full chunk of a backwards search shouldn't be
+    # skipped either.
+    data = b"\xff" * 0x10 + b"nor0\x00" + b"\xff" * 0x1000
+    driver = BufferDriver(data)
+
+    assert driver.find_any([b"nor0\x00"], 0, len(data), 0x800, True) == 0x10
+    assert driver.find_any([b"spi_nand0\x00"], 0, len(data), 0x800, True) is None
+
+
+def test_driver_finditer():
+    data = b"nor0\x00" + b"\xff" * 0x7FD + b"nor0\x00" + b"\xff" * 0x100 + b"nor0\x00"
+    expected = [(0, b"nor0\x00"), (0x802, b"nor0\x00"), (0x907, b"nor0\x00")]
+
+    for driver in [BinaryIODriver(BytesIO(data)), BufferDriver(data)]:
+        assert list(driver.finditer([b"nor0\x00"], 0, len(data), 0x800)) == expected
+        assert (
+            list(driver.finditer([b"nor0\x00"], 0, len(data), 0x800, True))
+            == (expected[::-1])
+        )
+        assert list(driver.finditer([b"nor0\x00"], 1, 0x906, 0x800)) == expected[1:2]
+
+
+def test_instrumented_driver():
+    data = b"\xff" * 0x1000 + b"nor0\x00" + b"\xff" * 0x1000
+    driver = InstrumentedDriver(BufferDriver(data))
+
+    assert driver.read(0x10, 0x20) == b"\xff" * 0x20
+    assert driver.find_any([b"nor0\x00"], 0, len(data), 0x800) == 0x1000
+
+    stats = driver.stats()
+    assert len(stats.reads) == 4
+    assert stats.reads[0].offset == 0x10
+    assert stats.reads[0].size == 0x20
+    assert stats.size_calls == 1
+
+    (search,) = stats.searches
+    assert search.chunks == 3
+    assert search.hit == 0x1000
+
+    assert "hit 0x1000" in stats.summary()
+
+
+def test_cached_driver():
+    data = bytes(range(256)) * 0x80
+    inner = InstrumentedDriver(BufferDriver(data))
+    driver = CachedDriver(inner, block_size=0x100, capacity=16, readahead=2)
+
+    assert driver.read(0x80, 0x10) == data[0x80:0x90]
+    assert driver.read(0xF0, 0x20) == data[0xF0:0x110]
+    assert driver.read(0x0, 0x10) == data[0x0:0x10]
+    assert driver.read(0x7FF8, 0x100) == data[0x7FF8:]
+    assert driver.read(0x8000, 0x10) == b""
+
+    # Only the blocks that weren't already cached should have been read (plus
+    # readahead for what looks like a forward scan).
+    assert [(r.offset, r.size) for r in inner.stats().reads] == [
+        (0x0, 0x100),
+        (0x100, 0x300),
+        (0x7F00, 0x100),
+    ]
+
+
+def test_cached_driver_small_capacity():
+    data = bytes(range(256)) * 0x40
+
+    # Readahead larger than the cache must not evict the requested blocks.
+    for capacity, readahead in [(2, 4), (8, 16)]:
+        driver = CachedDriver(
+            BufferDriver(data), block_size=0x100, capacity=capacity, readahead=readahead
+        )
+
+        for offset in range(0, 0x1000, 0x80):
+            assert driver.read(offset, 0x80) == data[offset : offset + 0x80]
+        for offset in range(0x3F80, 0x3000, -0x80):
+            assert driver.read(offset, 0x80) == data[offset : offset + 0x80]
+
+
+def test_cached_driver_readahead():
+    data = bytes(range(256)) * 0x100
+    inner = InstrumentedDriver(BufferDriver(data))
+    driver = CachedDriver(inner, block_size=0x100, capacity=16, readahead=2)
+
+    # Scanning forwards should read ahead...
+    for offset in range(0x0, 0x800, 0x80):
+        assert driver.read(offset, 0x80) == data[offset : offset + 0x80]
+
+    assert [(r.offset, r.size) for r in inner.stats().reads] == [
+        (0x0, 0x100),
+        (0x100, 0x300),
+        (0x400, 0x300),
+        (0x700, 0x300),
+    ]
+
+    # ...and so should scanning backwards.
+    inner.stats().reads.clear()
+    for offset in range(0x4000, 0x3800, -0x80):
+        assert driver.read(offset, 0x80) == data[offset : offset + 0x80]
+
+    assert [(r.offset, r.size) for r in inner.stats().reads] == [
+        (0x4000, 0x100),
+        (0x3D00, 0x300),
+        (0x3A00, 0x300),
+        (0x3700, 0x300),
+    ]
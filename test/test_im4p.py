@@ -0,0 +1,143 @@
+import struct
+
+import pytest
+
+from ibis.driver import BufferDriver
+from ibis.im4p import Im4pDriver, Im4pError, is_im4p
+
+
+def _der(tag: int, contents: bytes) -> bytes:
+    length = len(contents)
+    if length < 0x80:
+        return bytes([tag, length]) + contents
+
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([tag, 0x80 | len(encoded)]) + encoded + contents
+
+
+def _im4p(payload: bytes, *extra: bytes) -> bytes:
+    return _der(
+        0x30,
+        _der(0x16, b"IM4P")
+        + _der(0x16, b"ibot")
+        + _der(0x16, b"iBoot-1234.5.6")
+        + _der(0x04, payload)
+        + b"".join(extra),
+    )
+
+
+def _lzss(data: bytes) -> bytes:
+    """Compress data using (a naive implementation of) LZSS."""
+
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        flags, items = 0, bytearray()
+        for bit in range(8):
+            if i >= len(data):
+                break
+
+            best, best_distance = 0, 0
+            for distance in range(1, min(i, 0x100) + 1):
+                length = 0
+                while (
+                    length < 18
+                    and i + length < len(data)
+                    and data[i - distance + length] == data[i + length]
+                ):
+                    length += 1
+                if length > best:
+                    best, best_distance = length, distance
+
+            if best >= 3:
+                position = (i - best_distance + 0xFEE) & 0xFFF
+                items += bytes([position & 0xFF, (position >> 4) & 0xF0 | best - 3])
+                i += best
+            else:
+                flags |= 1 << bit
+                items.append(data[i])
+                i += 1
+
+        out.append(flags)
+        out += items
+
+    header = struct.pack(">8sIII", b"complzss", 0, len(data), len(out))
+    return header.ljust(0x180, b"\x00") + out
+
+
+def test_im4p_raw():
+    payload = bytes(range(256)) * 4
+    driver = Im4pDriver(BufferDriver(_im4p(payload)))
+
+    assert driver.type == "ibot"
+    assert driver.description == "iBoot-1234.5.6"
+    assert driver.compression is None
+    assert driver.size() == len(payload)
+    assert bytes(driver.read(0x3F0, 0x20)) == payload[0x3F0:]
+    assert driver.find_any([b"\x10\x11\x12"], 0x20, 0x400, 0x100) == 0x110
+
+
+def test_im4p_img4():
+    payload = b"payload" * 0x40
+    img4 = _der(0x30, _der(0x16, b"IMG4") + _im4p(payload) + _der(0xA1, b""))
+
+    assert is_im4p(BufferDriver(img4))
+    assert bytes(Im4pDriver(BufferDriver(img4)).read(0, 0x10)) == payload[:0x10]
+
+
+def test_im4p_lzss():
+    payload = b"".join(
+        f"iBoot {i:04x} ".encode() + bytes(i % 7) + b"\xff" * (i % 5)
+        for i in range(200)
+    )
+    driver = Im4pDriver(BufferDriver(_im4p(_lzss(payload))))
+
+    assert driver.compression == "lzss"
+    assert driver.size() == len(payload)
+
+    # Reads don't need to be in order, and may extend beyond the end.
+    assert bytes(driver.read(0x100, 0x40)) == payload[0x100:0x140]
+    assert bytes(driver.read(0, 0x10)) == payload[:0x10]
+    assert bytes(driver.read(0, len(payload) + 0x10)) == payload
+    assert driver.find_any([b"iBoot 00c7"], 0, len(payload), 0x80) == payload.find(
+        b"iBoot 00c7"
+    )
+
+
+def _lzss_im4p(compressed: bytes, size: int) -> bytes:
+    header = struct.pack(">8sIII", b"complzss", 0, size, len(compressed))
+    return _im4p(header.ljust(0x180, b"\x00") + compressed)
+
+
+def test_im4p_lzss_ring_prefill():
+    # References to before the start of the output see the initial contents
+    # of the ring buffer: spaces up to the initial write position at 0xFEE,
+    # and zeros from there on.
+    im4p = _lzss_im4p(bytes([0b01, ord("x"), 0x00, 0x02]), 6)
+    assert bytes(Im4pDriver(BufferDriver(im4p)).read(0, 6)) == b"x     "
+
+    im4p = _lzss_im4p(bytes([0b00, 0xED, 0xF0]), 3)
+    assert bytes(Im4pDriver(BufferDriver(im4p)).read(0, 3)) == b"   "
+
+    im4p = _lzss_im4p(bytes([0b00, 0xEE, 0xF0]), 3)
+    assert bytes(Im4pDriver(BufferDriver(im4p)).read(0, 3)) == b"\x00\x00\x00"
+
+
+def test_im4p_lzfse():
+    liblzfse = pytest.importorskip("liblzfse")
+
+    payload = b"iBoot for d83, Copyright 2007-2025, Apple Inc." * 0x100
+    driver = Im4pDriver(BufferDriver(_im4p(liblzfse.compress(payload))))
+
+    assert driver.compression == "lzfse"
+    assert driver.size() == len(payload)
+    assert bytes(driver.read(0x30, 0x10)) == payload[0x30:0x40]
+
+
+def test_im4p_invalid():
+    assert not is_im4p(BufferDriver(b"\x00" * 0x10))
+
+    with pytest.raises(Im4pError, match="unexpected magic"):
+        Im4pDriver(BufferDriver(_der(0x30, _der(0x16, b"IM4R"))))
+    with pytest.raises(Im4pError, match="encrypted"):
+        Im4pDriver(BufferDriver(_im4p(b"payload", _der(0x04, b"keybags"))))
@@ -62,3 +62,23 @@ def test_layout_validate_bad_layout():
             data=Region(start=0x3000, end=0x4000),
             bss=Region(start=0x4000, end=0x5000),
         ).validate()
+
+
+def test_layout_dict_round_trip():
+    layout = Layout(
+        text=Region(start=0x1000, end=0x2000, file_offset=0),
+        const=Region(start=0x2000, end=0x3000, file_offset=0x1000),
+        data=Region(start=0x3000, end=0x4000, file_offset=0x2000),
+        bss=None,
+    )
+
+    obj = layout.to_dict()
+    assert obj["CONST"] == {
+        "offset": 0x1000,
+        "size": 0x1000,
+        "start": 0x2000,
+        "end": 0x3000,
+    }
+    assert "BSS" not in obj
+
+    assert Layout.from_dict(obj) == layout
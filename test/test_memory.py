@@ -0,0 +1,55 @@
+import pytest
+
+from ibis.driver import BufferDriver
+from ibis.layout import Layout, Region
+from ibis.memory import MemoryImage, UnmappedAddressError
+
+
+def _image() -> MemoryImage:
+    data = b"T" * 0x1000 + b"C" * 0x1000 + b"D" * 0x800
+    layout = Layout(
+        text=Region(0x10000, 0x11000, 0),
+        const=Region(0x11000, 0x12000, 0x1000),
+        data=Region(0x20000, 0x21000, 0x2000),  # Only half backed by the file.
+        bss=Region(0x21000, 0x30000),
+    )
+
+    return MemoryImage(BufferDriver(data), layout)
+
+
+def test_memory_translate():
+    memory = _image()
+
+    assert memory.va_to_offset(0x10000) == 0
+    assert memory.va_to_offset(0x11FFF) == 0x1FFF
+    assert memory.va_to_offset(0x20010) == 0x2010
+    assert memory.va_to_offset(0x20800) is None  # Zero-filled.
+    assert memory.va_to_offset(0x21000) is None  # BSS.
+    assert memory.va_to_offset(0x18000) is None  # Unmapped.
+
+    assert memory.offset_to_va(0) == 0x10000
+    assert memory.offset_to_va(0x1800) == 0x11800
+    assert memory.offset_to_va(0x27FF) == 0x207FF
+    assert memory.offset_to_va(0x2800) is None
+
+    addrs = [0x10004, 0x18000, 0x20004, 0x21000, 0xF000]
+    assert memory.va_to_offsets(addrs).tolist() == [0x4, -1, 0x2004, -1, -1]
+    assert memory.offsets_to_va([0x4, 0x2004, 0x9000]).tolist() == [
+        0x10004,
+        0x20004,
+        -1,
+    ]
+
+
+def test_memory_read():
+    memory = _image()
+
+    assert memory.read_va(0x10FFE, 4) == b"TTCC"
+    assert memory.read_va(0x207FE, 4) == b"DD\x00\x00"
+    assert memory.read_va(0x20FFE, 4) == b"\x00" * 4
+    assert memory.read_va(0x22000, 0xE000) == bytes(0xE000)
+
+    with pytest.raises(UnmappedAddressError):
+        memory.read_va(0x11FFE, 4)
+    with pytest.raises(UnmappedAddressError):
+        memory.read_va(0x40000, 1)
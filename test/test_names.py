@@ -0,0 +1,70 @@
+from common import MOV, RET, code_image
+
+from ibis.driver import BufferDriver
+from ibis.layout import Layout
+from ibis.names import NameRule, find_string_refs, identify_functions
+from ibis.scan import PACIBSP
+
+
+def _adrp(rd: int, pages: int) -> int:
+    return 0x90000000 | (pages & 0x3) << 29 | (pages >> 2 & 0x7FFFF) << 5 | rd
+
+
+def _add(rd: int, rn: int, imm: int) -> int:
+    return 0x91000000 | imm << 10 | rn << 5 | rd
+
+
+def _image() -> tuple[BufferDriver, Layout]:
+    # CONST is on the page after TEXT.
+    text = [
+        PACIBSP,  # 0x100000
+        _adrp(0, 1),
+        _add(0, 0, 0x10),  # "double panic in %s"
+        RET,
+        PACIBSP,  # 0x100010
+        MOV,
+        _adrp(1, 1),
+        _add(1, 1, 0x30),  # "other"
+        _adrp(2, 1),
+        _add(2, 3, 0x10),  # Different register; not a reference.
+        RET,
+        PACIBSP,  # 0x10002C
+        _adrp(3, 1),
+        MOV,
+        _add(4, 3, 0x38),  # "third", scheduled apart from its ADRP.
+        _adrp(5, 1),
+        _add(5, 6, 0),  # Overwrites the page; the next ADD isn't a reference.
+        _add(0, 5, 0x10),
+        RET,
+    ]
+
+    const = bytearray(0x40)
+    const[0x10:0x23] = b"double panic in %s\x00"
+    const[0x30:0x36] = b"other\x00"
+    const[0x38:0x3E] = b"third\x00"
+
+    return code_image(text, bytes(const), base=0x100000)
+
+
+def test_find_string_refs():
+    driver, layout = _image()
+
+    refs = find_string_refs(driver, layout)
+    assert refs.addresses.tolist() == [0x100004, 0x100018, 0x100030]
+    assert refs.strings.tolist() == [0, 1, 2]
+
+
+def test_identify_functions():
+    driver, layout = _image()
+
+    rules = (
+        NameRule("panic", b"double panic in", "prefix"),
+        NameRule("other", b"other"),
+        NameRule("third", b"third"),
+        NameRule("missing", b"missing"),
+    )
+    assert identify_functions(driver, layout, rules) == {
+        "panic": 0x100000,
+        "other": 0x100010,
+        "third": 0x10002C,
+    }
@@ -0,0 +1,108 @@
+import struct
+
+from common import MOV, RET, bl, code_image
+
+from ibis.driver import BufferDriver
+from ibis.layout import Layout, Region
+from ibis.outlined import find_outlined
+from ibis.scan import PACIBSP
+
+
+def _b(pc: int, target: int) -> int:
+    return 0x14000000 | ((target - pc) // 4) & 0x3FFFFFF
+
+
+def test_find_outlined():
+    text = [
+        PACIBSP,  # 0x00
+        bl(0x04, 0x40),
+        bl(0x08, 0x50),
+        bl(0x0C, 0x60),
+        bl(0x10, 0x70),
+        RET,
+        PACIBSP,  # 0x18
+        bl(0x1C, 0x40),
+        bl(0x20, 0x50),
+        bl(0x24, 0x60),
+        bl(0x28, 0x70),
+        bl(0x2C, 0x00),  # Backwards.
+        bl(0x30, 0x00),
+        RET,
+        MOV,
+        MOV,
+        MOV,  # 0x40, outlined.
+        MOV,
+        RET,
+        MOV,
+        MOV,  # 0x50, outlined (tail call).
+        _b(0x54, 0x18),
+        MOV,
+        MOV,
+        PACIBSP,  # 0x60, ordinary function.
+        MOV,
+        RET,
+        MOV,
+        MOV,  # 0x70, too long.
+        MOV,
+        MOV,
+        RET,
+    ]
+
+    driver, layout = code_image(text)
+    outlined = find_outlined(driver, layout, max_length=3)
+
+    assert outlined.addresses.tolist() == [0x1040, 0x1050]
+    assert outlined.sizes.tolist() == [0xC, 0x8]
+    assert outlined.callers.tolist() == [2, 2]
+    assert outlined.hashes[0] != outlined.hashes[1]
+    assert outlined.copies.tolist() == [1, 1]
+
+    # Neither helper is duplicated.
+    assert not find_outlined(driver, layout, max_length=3, min_copies=2).addresses
+
+
+def test_find_outlined_copies():
+    text = [
+        PACIBSP,  # 0x00
+        bl(0x04, 0x20),
+        bl(0x08, 0x28),
+        bl(0x0C, 0x30),
+        RET,
+        MOV,
+        MOV,
+        MOV,
+        MOV,  # 0x20, outlined.
+        RET,
+        MOV,  # 0x28, the same helper again.
+        RET,
+        MOV,  # 0x30, only called once.
+        MOV,
+        RET,
+    ]
+
+    driver, layout = code_image(text)
+
+    # Calls to each copy count towards the same helper.
+    for min_copies in [1, 2]:
+        outlined = find_outlined(driver, layout, min_copies=min_copies)
+
+        assert outlined.addresses.tolist() == [0x1020, 0x1028]
+        assert outlined.callers.tolist() == [1, 1]
+        assert outlined.copies.tolist() == [2, 2]
+        assert outlined.hashes[0] == outlined.hashes[1]
+
+
+def test_find_outlined_truncated():
+    # TEXT extends past the end of the file, as do the calls' target.
+    text = [PACIBSP, bl(0x04, 0x100), bl(0x08, 0x100), RET]
+
+    data = struct.pack(f"<{len(text)}I", *text)
+    layout = Layout(
+        text=Region(0x1000, 0x1200, 0),
+        const=Region(0x2000, 0x2100, 0x200),
+        data=Region(0x3000, 0x3100, 0x300),
+        bss=None,
+    )
+
+    outlined = find_outlined(BufferDriver(data), layout)
+    assert not outlined.addresses
@@ -0,0 +1,48 @@
+from ibis.driver import BufferDriver
+from ibis.pages import PageKind, PageMap
+
+
+def test_page_map_kinds():
+    data = bytes(0x1000) + b"\xff" * 0x1000 + b"\x00\x01" * 0x800 + b"\x00" * 0x10
+    pages = PageMap(BufferDriver(data))
+
+    assert len(pages) == 4
+    assert pages.kind(0x0) == PageKind.ZERO
+    assert pages.kind(0x1800) == PageKind.FILL
+    assert pages.kind(0x2000) == PageKind.CONTENT
+    assert pages.kind(0x3000) == PageKind.ZERO  # Partial page
+    assert pages.kind(0x8000) == PageKind.ZERO  # Beyond the end
+
+    assert pages.is_padding(0x1000)
+    assert not pages.is_zero(0x1000)
+
+
+def test_page_map_lazy():
+    data = bytearray(0x4000)
+    pages = PageMap(BufferDriver(data))
+
+    assert pages.is_zero(0x1000)
+
+    # Only the probed page should have been classified (and remembered).
+    data[0x1000] = data[0x2000] = 1
+    assert pages.is_zero(0x1000)
+    assert not pages.is_zero(0x2000)
+
+
+def test_page_map_runs():
+    data = b"\x01" * 0x2000 + bytes(0x1000) + b"\x02" * 0x1000 + bytes(0x2000)
+    pages = PageMap(BufferDriver(data)).scan()
+
+    assert list(pages.runs()) == [
+        (0x0000, 0x2000, PageKind.FILL),
+        (0x2000, 0x3000, PageKind.ZERO),
+        (0x3000, 0x4000, PageKind.FILL),
+        (0x4000, 0x6000, PageKind.ZERO),
+    ]
+    assert list(pages.runs(0x1800, 0x2800)) == [
+        (0x1800, 0x2000, PageKind.FILL),
+        (0x2000, 0x2800, PageKind.ZERO),
+    ]
+
+    assert pages.content_end(0x0, 0x6000) == 0x4000
+    assert pages.content_end(0x4000, 0x6000) == 0x4000
@@ -0,0 +1,40 @@
+from common import MOV, RET, bl, code_image
+
+from ibis.driver import InstrumentedDriver
+from ibis.plugins import find_functions
+from ibis.scan import PACIBSP
+
+# A function calling an outlined helper (or a leaf function), and another.
+CODE = [
+    PACIBSP,  # 0x1000
+    bl(0x04, 0x20),
+    bl(0x08, 0x20),
+    RET,
+    PACIBSP,  # 0x1010
+    MOV,
+    RET,
+    MOV,
+    MOV,  # 0x1020
+    RET,
+]
+
+
+def test_find_functions():
+    driver, layout = code_image(CODE)
+
+    # Nothing references any strings, so only the outlined candidate is named.
+    assert find_functions(driver, layout) == {
+        0x1000: None,
+        0x1010: None,
+        0x1020: "outlined_candidate_1020",
+    }
+
+
+def test_find_functions_reads_once():
+    driver, layout = code_image(CODE)
+
+    # Drivers that can't provide windows without copying are only read once,
+    # rather than by every scanner.
+    instrumented = InstrumentedDriver(driver)
+    assert find_functions(instrumented, layout) == find_functions(driver, layout)
+    assert len(instrumented.stats().reads) == 1
@@ -0,0 +1,40 @@
+import struct
+
+from common import MOV, RET, code_image
+
+from ibis.driver import BufferDriver
+from ibis.layout import Layout, Region
+from ibis.scan import PACIBSP, find_prologues, find_starts
+
+
+def test_find_prologues():
+    pacibsp = struct.pack("<I", PACIBSP)
+
+    text = bytearray(0x100)
+    text[0x00:0x04] = pacibsp
+    text[0x42:0x46] = pacibsp  # Unaligned, shouldn't match.
+    text[0x80:0x84] = pacibsp
+    text[0xFC:0x100] = pacibsp
+
+    layout = Layout(
+        text=Region(0x1000, 0x10FC, 0),
+        const=Region(0x1100, 0x1200, 0x100),
+        data=Region(0x2000, 0x2100, 0x200),
+        bss=None,
+    )
+
+    # The last PACIBSP is outside of TEXT.
+    prologues = find_prologues(BufferDriver(bytes(text) * 2), layout)
+    assert prologues.tolist() == [0x1000, 0x1080]
+
+
+def test_find_starts():
+    stp = 0xA9BF7BFD  # stp x29, x30, [sp, #-0x10]!
+
+    # Images with pointer authentication are seeded from PACIBSP alone...
+    driver, layout = code_image([PACIBSP, MOV, RET, stp, MOV, RET])
+    assert find_starts(driver, layout).tolist() == [0x1000]
+
+    # ...and others from their prologues instead.
+    driver, layout = code_image([stp, MOV, RET, stp, MOV, RET])
+    assert find_starts(driver, layout).tolist() == [0x1000, 0x100C]
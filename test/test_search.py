@@ -0,0 +1,36 @@
+import pytest
+
+from ibis.search import PatternSet, compile_patterns
+
+
+def test_pattern_set_search():
+    patterns = PatternSet([b"nor0\x00", b"spi_nor0\x00", b"arch_vtop\x00"])
+    data = b"xxxxspi_nor0\x00xxxxarch_vtop\x00"
+
+    assert patterns.search(data, 0, len(data)) == (4, b"spi_nor0\x00")
+    assert patterns.search(data, 5, len(data)) == (8, b"nor0\x00")
+    assert patterns.search(data, 9, len(data)) == (17, b"arch_vtop\x00")
+    assert patterns.search(data, 9, len(data) - 1) is None
+
+
+def test_pattern_set_finditer():
+    patterns = PatternSet([b"nor0\x00", b"spi_nor0\x00", b"arch_vtop\x00"])
+    data = b"xxxxspi_nor0\x00xxxxarch_vtop\x00nor0\x00"
+
+    assert list(patterns.finditer(data, 0, len(data))) == [
+        (4, b"spi_nor0\x00"),
+        (8, b"nor0\x00"),
+        (17, b"arch_vtop\x00"),
+        (27, b"nor0\x00"),
+    ]
+
+
+def test_pattern_set_invalid():
+    with pytest.raises(ValueError):
+        PatternSet([])
+    with pytest.raises(ValueError):
+        PatternSet([b"nor0\x00", b""])
+
+
+def test_compile_patterns_cached():
+    assert compile_patterns((b"a", b"b")) is compile_patterns((b"a", b"b"))
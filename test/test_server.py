@@ -0,0 +1,142 @@
+import base64
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+from ibis import server
+from ibis.batch import AnalysisOptions
+from ibis.server import Analyzer, HTTPServer, UnixServer
+
+
+def test_analyzer_handle():
+    analyzer = Analyzer(AnalysisOptions())
+
+    response = analyzer.handle({"data": base64.b64encode(b"\x00" * 0x400).decode()})
+    assert response["error"].startswith("BannerParseError")
+
+    response = analyzer.handle({})
+    assert response["error"].startswith("RequestError")
+
+    stats = analyzer.handle({"op": "stats"})
+    assert stats["requests"] == 2
+    assert stats["errors"] == 2
+
+
+def test_unix_server(tmp_path):
+    path = tmp_path / "ibis.sock"
+
+    with ThreadPoolExecutor(2) as executor:
+        unix = UnixServer(path, Analyzer(AnalysisOptions()), executor)
+        threading.Thread(target=unix.serve_forever, daemon=True).start()
+
+        try:
+            with socket.socket(socket.AF_UNIX) as s, s.makefile("rwb") as f:
+                s.connect(str(path))
+
+                f.write(b'{"path": "/nonexistent"}\n{"op": "stats"}\n')
+                f.flush()
+
+                assert "FileNotFoundError" in json.loads(f.readline())["error"]
+                assert json.loads(f.readline())["requests"] == 1
+        finally:
+            unix.shutdown()
+            unix.server_close()
+
+
+def test_unix_server_limits(tmp_path, monkeypatch):
+    path = tmp_path / "ibis.sock"
+
+    monkeypatch.setattr(server, "MAX_REQUEST_SIZE", 64)
+    monkeypatch.setattr(server, "MAX_CONNECTION_REQUESTS", 2)
+    monkeypatch.setattr(server._UnixHandler, "timeout", 0.1)
+
+    # A single worker, so every connection must give it up for the next.
+    with ThreadPoolExecutor(1) as executor:
+        unix = UnixServer(path, Analyzer(AnalysisOptions()), executor)
+        threading.Thread(target=unix.serve_forever, daemon=True).start()
+
+        def connect():
+            s = socket.socket(socket.AF_UNIX)
+            s.connect(str(path))
+            return s, s.makefile("rwb")
+
+        try:
+            # Idle connections are closed.
+            s, f = connect()
+            with s, f:
+                assert f.readline() == b""
+
+            # Connections are closed after enough requests.
+            s, f = connect()
+            with s, f:
+                f.write(b'{"op": "stats"}\n' * 3)
+                f.flush()
+
+                assert "uptime" in json.loads(f.readline())
+                assert "uptime" in json.loads(f.readline())
+                assert f.readline() == b""
+
+            # Oversized requests are rejected, and the connection closed.
+            s, f = connect()
+            with s, f:
+                f.write(b'{"path": "' + b"x" * 64 + b'"}\n')
+                f.flush()
+
+                assert "exceeds" in json.loads(f.readline())["error"]
+                assert f.readline() == b""
+        finally:
+            unix.shutdown()
+            unix.server_close()
+
+
+def test_http_server_limits(monkeypatch):
+    monkeypatch.setattr(server, "MAX_REQUEST_SIZE", 64)
+
+    with ThreadPoolExecutor(1) as executor:
+        http = HTTPServer(0, Analyzer(AnalysisOptions()), executor)
+        threading.Thread(target=http.serve_forever, daemon=True).start()
+
+        try:
+            connection = HTTPConnection("127.0.0.1", http.server_address[1])
+            connection.request("POST", "/analyze", b"\x00" * 65)
+
+            response = connection.getresponse()
+            assert response.status == 413
+            assert "exceeds" in json.loads(response.read())["error"]
+
+            connection.close()
+        finally:
+            http.shutdown()
+            http.server_close()
+
+
+def _crash(*_):
+    os._exit(1)
+
+
+def test_analyzer_processes(monkeypatch):
+    analyzer = Analyzer(AnalysisOptions(), processes=1)
+    request = {"data": base64.b64encode(b"\x00" * 0x400).decode()}
+
+    try:
+        # Failures in the workers are reported just like any other.
+        response = analyzer.handle(request)
+        assert response["error"].startswith("BannerParseError")
+
+        # Workers are forked (on demand), so they see the patched function too.
+        analyzer.close()
+        monkeypatch.setattr(server, "_analyze_data", _crash)
+
+        response = analyzer.handle(request)
+        assert response["error"].startswith("BrokenProcessPool")
+
+        # The pool is replaced, rather than failing every later request.
+        monkeypatch.undo()
+
+        response = analyzer.handle(request)
+        assert response["error"].startswith("BannerParseError")
+    finally:
+        analyzer.close()
@@ -0,0 +1,45 @@
+from common import MOV, RET, code_image
+
+from ibis.scan import PACIBSP
+from ibis.signatures import Signature, find_function_starts, match_signatures
+
+NOP = 0xD503201F
+STP_FP_LR = 0xA9BF7BFD  # stp x29, x30, [sp, #-0x10]!
+STP_X20_X19 = 0xA9BE4FF4  # stp x20, x19, [sp, #-0x20]!
+SUB_SP = 0xD10083FF  # sub sp, sp, #0x20
+STP_OFFSET = 0xA9017BFD  # stp x29, x30, [sp, #0x10]
+
+
+def test_match_signatures():
+    driver, layout = code_image(
+        [
+            STP_FP_LR,  # 0x1000
+            MOV,
+            RET,
+            STP_X20_X19,  # 0x100C
+            MOV,
+            SUB_SP,  # 0x1014
+            STP_OFFSET,
+            MOV,
+            NOP,
+            PACIBSP,  # 0x1024
+            SUB_SP,  # 0x1028, not followed by a store.
+            MOV,
+        ]
+    )
+
+    candidates = match_signatures(driver, layout.text)
+    assert candidates.addresses.tolist() == [0x1000, 0x100C, 0x1014, 0x1024]
+    assert candidates.scores.tolist() == [2, 2, 2, 4]
+
+    starts = find_function_starts(driver, layout, min_score=3)
+    assert starts.addresses.tolist() == [0x1024]
+
+
+def test_match_signatures_aligned():
+    # The pattern matches once aligned, and once straddling two words.
+    signature = Signature("test", ((0xFFFF0000, 0x12340000),), 1)
+    driver, layout = code_image([0x12340000, 0x00001234, MOV])
+
+    candidates = match_signatures(driver, layout.text, (signature,))
+    assert candidates.addresses.tolist() == [0x1000]
@@ -0,0 +1,53 @@
+from ibis.driver import BufferDriver
+from ibis.layout import Region
+from ibis.strings import StringIndex
+
+DATA = (
+    b"\x01\x02nor0\x00"  # 0x02
+    b"abc\x00"  # Too short.
+    b"double panic in\x00"  # 0x0B
+    b"\xffnor0\x00"  # 0x1C
+    b"panic: %s\n\x00"  # 0x21
+    b"unterminated"
+)
+
+
+def test_string_index():
+    index = StringIndex(BufferDriver(DATA))
+
+    assert len(index) == 4
+    assert [index[i] for i in range(len(index))] == [
+        b"nor0",
+        b"double panic in",
+        b"nor0",
+        b"panic: %s\n",
+    ]
+    assert index.offsets.tolist() == [0x02, 0x0B, 0x1C, 0x21]
+
+    assert index.exact(b"nor0") == [0, 2]
+    assert index.exact(b"nor") == []
+    assert index.prefix(b"panic") == [3]
+    assert index.prefix(b"no") == [0, 2]
+    assert index.prefix(b"zzz") == []
+    assert index.substring(b"panic") == [1, 3]
+    assert index.substring(b"0") == [0, 2]
+
+
+def test_string_index_region():
+    driver = BufferDriver(DATA)
+    region = Region(0x1000, 0x1000 + len(DATA) - 0x1B, 0x1B)
+
+    index = StringIndex.for_driver(driver, region)
+    assert index is StringIndex.for_driver(driver, region)
+
+    assert [index[i] for i in range(len(index))] == [b"nor0", b"panic: %s\n"]
+    assert index.offsets.tolist() == [0x1C, 0x21]
+    assert index.addresses.tolist() == [0x1001, 0x1006]
+
+
+def test_string_index_unterminated():
+    # A long printable run without a terminator mustn't take quadratic time.
+    index = StringIndex(BufferDriver(b"a" * 0x100000 + b"\xfftail\x00"))
+
+    assert [index[i] for i in range(len(index))] == [b"tail"]
+    assert index.offsets.tolist() == [0x100001]
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+
+from ibis.context import App, Context
+from ibis.layout import Layout, Region
+from ibis.table import LayoutTable
+
+
+def _layout(base: int, bss: bool = True) -> Layout:
+    return Layout(
+        text=Region(base, base + 0x1000, 0),
+        const=Region(base + 0x1000, base + 0x2000, 0x1000),
+        data=Region(base + 0x10000, base + 0x11000, 0x2000),
+        bss=Region(base + 0x11000, base + 0x12000) if bss else None,
+    )
+
+
+def _table() -> LayoutTable:
+    table = LayoutTable()
+    table.append(
+        "a",
+        Context("SecureROM for t8030si, Copyright", "iBoot-4479.0.0.100.4"),
+        _layout(0x100000000),
+    )
+    table.append(
+        "b",
+        Context("iBoot for n104, Copyright", "iBoot-6723.0.0.1.2"),
+        _layout(0x180000000, bss=False),
+    )
+    table.append(
+        "c",
+        Context("iBoot for d321, Copyright", "iBoot-6723.0.0.1.2"),
+        _layout(0x180000000),
+    )
+
+    return table
+
+
+def test_layout_hashable():
+    assert hash(_layout(0x1000)) == hash(_layout(0x1000))
+    assert len({_layout(0x1000), _layout(0x1000), _layout(0x2000)}) == 2
+
+
+def test_layout_table_rows():
+    table = _table()
+
+    assert len(table) == 3
+    assert table.layout(0) == _layout(0x100000000)
+    assert table.layout(1) == _layout(0x180000000, bss=False)
+    assert table.context(2).to_dict() == {
+        "app": "iBoot",
+        "version": "6723.0.0.1.2",
+        "target": "d321",
+    }
+
+    records = [table.record(i) for i in range(len(table))]
+    assert LayoutTable.from_records([*records, {"error": "x"}]).record(1) == records[1]
+
+
+def test_layout_table_filter_group():
+    table = _table()
+
+    assert table.filter(app=App.IBOOT).paths == ["b", "c"]
+    assert table.filter(app=App.IBOOT, target="d321").paths == ["c"]
+    assert table.filter(major=4479).paths == ["a"]
+    assert table.filter(target="unknown").paths == []
+
+    groups = table.group_by("app", "major")
+    assert {key: group.paths for key, group in groups.items()} == {
+        (App.SECURE_ROM, 4479): ["a"],
+        (App.IBOOT, 6723): ["b", "c"],
+    }
+    assert groups[(App.IBOOT, 6723)].target(1) == "d321"
+
+
+def test_layout_table_export():
+    table = _table()
+
+    output = io.StringIO()
+    table.to_csv(output)
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert len(rows) == 3
+    assert rows[1]["target"] == "n104"
+    assert rows[0]["text_start"] == str(0x100000000)
+    assert rows[1]["bss_start"] == ""
+    assert rows[2]["bss_offset"] == ""
+
+    output = io.StringIO()
+    table.to_ndjson(output)
+
+    lines = output.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        table.record(i) for i in range(len(table))
+    ]
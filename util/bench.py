@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from ibis.analyzer import analyze
+from ibis.driver import Driver, InstrumentedDriver, MmapDriver
+from ibis.layout import Layout
+from ibis.scan import find_prologues
+
+CORPUS_PATH = Path(__file__).parent.parent / "corpus"
+
+METRICS = ["time", "reads", "bytes_read", "peak_memory"]
+
+
+Task = Callable[[Driver, Layout], object]
+
+
+def measure(path: Path, task: Task, repeat: int) -> dict:
+    if repeat < 1:
+        raise ValueError(f"invalid repeat count: {repeat}")
+
+    with path.open("rb") as f:
+        # Anything the task depends on (but isn't measuring) is prepared up
+        # front, outside of the timed runs.
+        with MmapDriver(f) as driver:
+            layout = analyze(driver)
+
+        # Time the best of several runs, with a fresh driver for each so that
+        # nothing is carried over between them. The drivers aren't wrapped in
+        # an `InstrumentedDriver`, which would hide the zero-copy windows the
+        # searches rely on and time a copy of the image instead.
+        best = float("inf")
+        for _ in range(repeat):
+            with MmapDriver(f) as driver:
+                start = time.perf_counter()
+                task(driver, layout)
+                best = min(best, time.perf_counter() - start)
+
+        # Reads are counted in a run of their own, since they need the
+        # instrumentation that the timed runs avoid.
+        with MmapDriver(f) as base:
+            driver = InstrumentedDriver(base)
+            task(driver, layout)
+            stats = driver.stats()
+
+        # Memory is measured separately too, since tracing slows everything
+        # down.
+        with MmapDriver(f) as driver:
+            tracemalloc.start()
+            task(driver, layout)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return {
+        "time": best,
+        "reads": len(stats.reads),
+        "bytes_read": stats.bytes_read,
+        "peak_memory": peak_memory,
+    }
+
+
+TASKS: dict[str, Task] = {
+    "detect_context": lambda d, _: d.detect_context(),
+    "analyze": lambda d, _: analyze(d),
+    "find_prologues": find_prologues,
+}
+
+
+def run(paths: list[Path], repeat: int) -> dict:
+    results = {}
+    for path in paths:
+        print(f"Benchmarking {path.name}...", file=sys.stderr)
+
+        try:
+            results[path.name] = {
+                name: measure(path, task, repeat) for name, task in TASKS.items()
+            }
+        except Exception as e:
+            print(f"Failed to benchmark {path.name}: {e}", file=sys.stderr)
+
+    return results
+
+
+def compare(baseline: dict, results: dict, threshold: float, slack: float) -> list[str]:
+    """
+    Compare results against a baseline, returning a description of each metric
+    that regressed by more than `threshold` times its baseline value.
+
+    Timings must also regress by at least `slack` seconds, so that noise on
+    very fast tasks isn't reported.
+    """
+
+    regressions = []
+    for binary, tasks in results.items():
+        for task, metrics in tasks.items():
+            if not (base := baseline.get(binary, {}).get(task)):
+                continue
+
+            for metric in METRICS:
+                old, new = base[metric], metrics[metric]
+                if new <= old * threshold:
+                    continue
+                if metric == "time" and new - old < slack:
+                    continue
+
+                regressions.append(f"{binary}: {task} {metric} {old:.6g} -> {new:.6g}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "paths",
+        metavar="path",
+        type=Path,
+        nargs="*",
+        help="binaries to benchmark (default: essential corpus and gauntlet)",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="write results to a baseline JSON file"
+    )
+    parser.add_argument(
+        "-c",
+        "--compare",
+        metavar="BASELINE",
+        type=Path,
+        help="compare results to a baseline JSON file, failing on regressions",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="maximum allowed ratio of result to baseline (default: 1.5)",
+    )
+    parser.add_argument(
+        "-s",
+        "--slack",
+        type=float,
+        default=0.005,
+        help="minimum timing regression to report, in seconds (default: 0.005)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="number of timed runs per task, best is kept (default: 5)",
+    )
+
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    paths = args.paths or sorted(
+        p
+        for p in [*CORPUS_PATH.iterdir(), *(CORPUS_PATH / "gauntlet").iterdir()]
+        if p.is_file()
+    )
+
+    results = run(paths, args.repeat)
+
+    name_width = max((len(b) for b in results), default=0)
+    for binary, tasks in results.items():
+        for task, m in tasks.items():
+            print(
+                f"{binary:<{name_width}}  {task:<16}{m['time'] * 1000:>10.3f} ms"
+                f"{m['reads']:>8} reads{m['bytes_read']:>12} B"
+                f"{m['peak_memory']:>12} B peak"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if regressions := compare(baseline, results, args.threshold, args.slack):
+            print("\nRegressions:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,42 +2,46 @@
 
 import argparse
 import csv
+import logging
 import sys
 from itertools import chain
 from pathlib import Path
 
+from index import CorpusIndex, add_index_argument, corpus_files
+
 from ibis.context import App
-from ibis.driver import BinaryIODriver
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("dir", type=Path, help="directory to process")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of worker processes for rescanning"
+    )
+    add_index_argument(parser)
 
     args = parser.parse_args()
 
     if not args.dir.exists() or not args.dir.is_dir():
         raise ValueError("input directory is missing or not a directory")
 
+    with CorpusIndex.for_directory(args.dir, args.index) as index:
+        index.update(corpus_files(args.dir), args.jobs, layouts=False)
+        entries = index.under(args.dir)
+
     map: dict[App, dict[int, set[str]]] = {}
-    for path in args.dir.glob("**/*"):
-        if not path.is_file():
+    for entry in entries:
+        ctx = entry.context
+        if ctx is None:
+            logging.error(f"Failed to detect context for file: {entry.path}")
             continue
 
-        with path.open("rb") as f:
-            driver = BinaryIODriver(f)
-            try:
-                ctx = driver.detect_context()
-            except Exception:
-                print(f"Failed to detect context for file: {path}")
-                raise
-
-            if ctx.app not in map:
-                map[ctx.app] = {}
-            if ctx.version.major not in map[ctx.app]:
-                map[ctx.app][ctx.version.major] = set()
+        if ctx.app not in map:
+            map[ctx.app] = {}
+        if ctx.version.major not in map[ctx.app]:
+            map[ctx.app][ctx.version.major] = set()
 
-            map[ctx.app][ctx.version.major].add(ctx.target)
+        map[ctx.app][ctx.version.major].add(ctx.target)
 
     all_apps = map.keys()
     all_versions = sorted(chain.from_iterable([map[app].keys() for app in map]))
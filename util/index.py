@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import sqlite3
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from hashlib import sha256
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO
+
+from ibis import __version__
+from ibis.analyzer import analyze
+from ibis.cache import LayoutCache
+from ibis.context import Context
+from ibis.driver import BufferDriver, MmapDriver
+from ibis.layout import Layout
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    app TEXT,
+    version TEXT,
+    target TEXT,
+    layout TEXT,
+    error TEXT,
+    ibis_version TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_context ON files (app, version, target);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+"""
+
+_FIELDS = (
+    "path",
+    "size",
+    "mtime_ns",
+    "sha256",
+    "app",
+    "version",
+    "target",
+    "layout",
+    "error",
+    "ibis_version",
+)
+_COLUMNS = ", ".join(_FIELDS)
+
+_HASH_CHUNK_SIZE = 1 << 20
+_HEADER_SIZE = 0x400
+
+_INSERT_BATCH_SIZE = 256
+
+
+def _batched(iterable: Iterable, n: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+
+
+@dataclass
+class Entry:
+    """Everything the index knows about a single file."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    sha256: str | None
+    context: Context | None
+    layout: Layout | None
+    error: str | None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Entry":
+        context = None
+        if row["app"] is not None:
+            context = Context.from_dict(
+                {"app": row["app"], "version": row["version"], "target": row["target"]}
+            )
+
+        layout = None
+        if row["layout"] is not None:
+            layout = Layout.from_dict(json.loads(row["layout"]))
+
+        return cls(
+            Path(row["path"]),
+            row["size"],
+            row["mtime_ns"],
+            row["sha256"],
+            context,
+            layout,
+            row["error"],
+        )
+
+
+def hash_file(f: BinaryIO) -> tuple[str, bytes]:
+    """
+    Get the SHA-256 digest of a file, streamed through a fixed-size buffer,
+    along with its first few bytes (enough for `Driver.detect_context`),
+    captured during the same pass.
+    """
+
+    digest = sha256()
+    header = b""
+
+    buffer = bytearray(_HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    while count := f.readinto(buffer):
+        if len(header) < _HEADER_SIZE:
+            header += view[: min(count, _HEADER_SIZE - len(header))]
+
+        digest.update(view[:count])
+
+    return digest.hexdigest(), header
+
+
+def scan(path: Path, layout: bool = True) -> tuple:
+    """
+    Hash a file and detect its context (and optionally, analyze its layout),
+    returning its row for the index.
+
+    The file is only read in full once, to hash it; the context is detected
+    from the start of the file, which is captured along the way.
+    """
+
+    st = path.stat()
+    row = {
+        "path": str(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "ibis_version": __version__,
+    }
+
+    try:
+        with path.open("rb", buffering=0) as f:
+            row["sha256"], header = hash_file(f)
+            row.update(BufferDriver(header).detect_context().to_dict())
+
+            if layout:
+                with MmapDriver(f) as driver:
+                    row["layout"] = json.dumps(analyze(driver).to_dict())
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+
+    return tuple(row.get(field) for field in _FIELDS)
+
+
+class CorpusIndex:
+    """
+    Persistent index of the files in a corpus, recording each file's hash,
+    context, and layout.
+
+    Files are only rescanned when their size or modification time changes (or
+    they were scanned by a different version of Ibis), so keeping the index
+    up to date is cheap; queries then don't need to touch the files at all.
+    """
+
+    db: sqlite3.Connection
+
+    def __init__(self, path: Path) -> None:
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+    @classmethod
+    def for_directory(cls, root: Path, path: Path | None = None) -> "CorpusIndex":
+        """
+        Open the index of a corpus directory, at `path` if given, or otherwise
+        at its default location (see `default_index_path`).
+        """
+
+        path = path or default_index_path(root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        return cls(path)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _stale(self, paths: Iterable[Path], layouts: bool) -> Iterator[Path]:
+        known = {
+            row["path"]: row
+            for row in self.db.execute(
+                "SELECT path, size, mtime_ns, ibis_version, layout, error FROM files"
+            )
+        }
+
+        for path in paths:
+            st = path.stat()
+
+            row = known.get(str(path))
+            if (
+                row is None
+                or (row["size"], row["mtime_ns"]) != (st.st_size, st.st_mtime_ns)
+                or row["ibis_version"] != __version__
+                or (layouts and row["layout"] is None and row["error"] is None)
+            ):
+                yield path
+
+    def update(
+        self, paths: Iterable[Path], jobs: int | None = None, layouts: bool = True
+    ) -> int:
+        """
+        Rescan whichever of the given files have changed since they were last
+        indexed, using a pool of `jobs` worker processes, and forget about any
+        indexed files which no longer exist.
+
+        If `layouts` is false, layouts aren't analyzed for files that need
+        rescanning (or for those that were previously scanned without them).
+
+        Returns the number of files rescanned.
+        """
+
+        stale = list(self._stale(paths, layouts))
+        logging.debug(f"Rescanning {len(stale)} file(s)")
+
+        insert = (
+            f"INSERT OR REPLACE INTO files ({_COLUMNS}) "
+            f"VALUES ({', '.join('?' * len(_FIELDS))})"
+        )
+
+        with ProcessPoolExecutor(jobs) as pool:
+            rows = pool.map(partial(scan, layout=layouts), stale, chunksize=16)
+
+            # Results are committed in batches as they arrive, so that progress
+            # isn't lost if a long update is interrupted.
+            for batch in _batched(rows, _INSERT_BATCH_SIZE):
+                with self.db:
+                    self.db.executemany(insert, batch)
+
+        self.prune()
+        return len(stale)
+
+    def prune(self):
+        """Forget about indexed files which no longer exist."""
+
+        missing = [
+            (row["path"],)
+            for row in self.db.execute("SELECT path FROM files")
+            if not Path(row["path"]).is_file()
+        ]
+
+        with self.db:
+            self.db.executemany("DELETE FROM files WHERE path = ?", missing)
+
+    def rename(self, old: Path, new: Path):
+        """Record that a file has been renamed, without rescanning it."""
+
+        with self.db:
+            self.db.execute(
+                "UPDATE files SET path = ? WHERE path = ?", (str(new), str(old))
+            )
+
+    def query(self, where: str = "1", params: tuple = ()) -> list[Entry]:
+        """Get the entries matching an SQL condition, ordered by path."""
+
+        rows = self.db.execute(
+            f"SELECT {_COLUMNS} FROM files WHERE {where} ORDER BY path", params
+        )
+        return [Entry.from_row(row) for row in rows]
+
+    def under(self, root: Path) -> list[Entry]:
+        """Get the entries for files within a directory."""
+
+        prefix = str(root.resolve()).rstrip("/") + "/"
+        return self.query("substr(path, 1, ?) = ?", (len(prefix), prefix))
+
+    def gauntlet(self, root: Path) -> list[Entry]:
+        """
+        Select one file for each distinct context (app, version, and target)
+        among the successfully analyzed files within a directory.
+        """
+
+        prefix = str(root.resolve()).rstrip("/") + "/"
+        return self.query(
+            "path IN (SELECT min(path) FROM files"
+            " WHERE substr(path, 1, ?) = ? AND error IS NULL"
+            " GROUP BY app, version, target)",
+            (len(prefix), prefix),
+        )
+
+
+def default_index_path(root: Path) -> Path:
+    """
+    Get the default location of a corpus directory's index, in the cache
+    directory (see `ibis.cache.LayoutCache.from_env`) rather than the corpus
+    itself, so that it is never mistaken for one of the corpus' files.
+    """
+
+    key = sha256(str(root.resolve()).encode()).hexdigest()[:16]
+    return LayoutCache.from_env().path / f"index-{key}.sqlite"
+
+
+def add_index_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--index", type=Path, help="index file to use (default: in the cache directory)"
+    )
+
+
+def corpus_files(root: Path, recursive: bool = True) -> list[Path]:
+    """List the files in a corpus directory."""
+
+    paths = root.resolve().rglob("*") if recursive else root.resolve().iterdir()
+    return sorted(p for p in paths if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", type=Path, help="corpus directory to index")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of worker processes for rescanning"
+    )
+    parser.add_argument(
+        "-g",
+        "--gauntlet",
+        action="store_true",
+        help="print a gauntlet selection (one file per distinct context)",
+    )
+    add_index_argument(parser)
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="enable verbose logging"
+    )
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG)
+
+    if not args.dir.exists() or not args.dir.is_dir():
+        raise ValueError("input directory is missing or not a directory")
+
+    with CorpusIndex.for_directory(args.dir, args.index) as index:
+        rescanned = index.update(corpus_files(args.dir), args.jobs)
+        logging.info(f"Rescanned {rescanned} file(s)")
+
+        entries = index.gauntlet(args.dir) if args.gauntlet else index.under(args.dir)
+        for entry in entries:
+            if entry.error:
+                print(f"{entry.path}: {entry.error}")
+            elif args.gauntlet:
+                print(entry.path)
+            else:
+                ctx = entry.context
+                print(f"{entry.path}: {ctx.app}/{ctx.version}/{ctx.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,9 @@
 
 import argparse
 import logging
-from hashlib import sha256
 from pathlib import Path
 
-from ibis.driver import BinaryIODriver
+from index import CorpusIndex, add_index_argument, corpus_files
 
 
 def main():
@@ -14,6 +13,10 @@ def main():
     parser.add_argument(
         "-d", "--dry-run", action="store_true", help="show (but don't perform) renames"
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of worker processes for rescanning"
+    )
+    add_index_argument(parser)
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="enable verbose logging"
     )
@@ -28,21 +31,21 @@ def main():
     if not args.dir.exists() or not args.dir.is_dir():
         raise ValueError("input directory is missing or not a directory")
 
-    for path in args.dir.iterdir():
-        if not path.is_file():
-            continue
+    with CorpusIndex.for_directory(args.dir, args.index) as index:
+        index.update(corpus_files(args.dir, recursive=False), args.jobs, layouts=False)
 
-        with path.open("rb") as f:
-            logging.debug(f"Processing file: {path}")
+        # Only files directly within the directory are renamed.
+        root = args.dir.resolve()
+        for entry in index.under(root):
+            if entry.path.parent != root:
+                continue
 
-            shorthash = sha256(f.read()).hexdigest()[:7]
-
-            driver = BinaryIODriver(f)
-            try:
-                ctx = driver.detect_context()
-            except Exception:
+            path, ctx = entry.path, entry.context
+            if ctx is None or entry.sha256 is None:
                 logging.error(f"Failed to detect context for file: {path}")
-                raise
+                continue
+
+            shorthash = entry.sha256[:7]
 
             new_name = f"{ctx.app}-{ctx.version}-{ctx.target}-{shorthash}"
             print(f"{path.name} -> {new_name}")
@@ -50,6 +53,7 @@ def main():
             new_path = path.parent / new_name
             if not args.dry_run:
                 path.rename(new_path)
+                index.rename(path, new_path)
 
 
 if __name__ == "__main__":